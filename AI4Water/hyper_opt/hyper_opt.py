@@ -1,41 +1,45 @@
 import os
 import json
-import copy
 import inspect
+import functools
 import warnings
 import traceback
 from typing import Union
+from types import MappingProxyType
 from collections import OrderedDict
+from collections.abc import Sequence
 
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
 from sklearn.model_selection import ParameterGrid, ParameterSampler
+from joblib import Parallel, delayed, effective_n_jobs
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import sklearn
-
-try:
-    import plotly
-except ImportError:
-    plotly = None
+from sklearn.base import BaseEstimator
+from sklearn.utils import check_random_state
 
 try:
     import dill
 except ImportError:
     dill = None
 
+try:  # private module of scipy, so the class name is checked if it moves
+    from scipy.stats._distn_infrastructure import rv_frozen
+except ImportError:
+    rv_frozen = None
+
 try:
     import skopt
-    from skopt import gp_minimize
+    from skopt import gp_minimize, forest_minimize, gbrt_minimize
     from skopt import BayesSearchCV
     from skopt.space.space import Space
     from skopt.utils import use_named_args
     from skopt.space.space import Dimension
-    from skopt.plots import plot_convergence, plot_evaluations
 except ImportError:
     skopt, gp_minimize, BayesSearchCV, Space, _Real, use_named_args = None, None, None, None, None, None
-    Dimension, _Integer, _Categorical, plot_evaluations, plot_convergence = None, None, None, None, None
+    forest_minimize, gbrt_minimize = None, None
+    Dimension, _Integer, _Categorical = None, None, None
 
 try:
     import hyperopt
@@ -55,11 +59,8 @@ try:
     import optuna
     from optuna.study import Study
     from optuna.trial._trial import TrialState
-    from optuna.visualization import plot_edf
-    from optuna.visualization import plot_parallel_coordinate, plot_contour, plot_slice
 except ImportError:
-    optuna, plot_parallel_coordinate, plot_contour, plot_edf, = None, None, None, None
-    Study = None
+    optuna, Study = None, None
 
 from AI4Water import Model
 from AI4Water.utils.SeqMetrics import RegressionMetrics
@@ -73,10 +74,11 @@ from AI4Water.hyper_opt.utils import plot_convergences
 from AI4Water.hyper_opt.utils import loss_histogram, plot_hyperparameters
 from AI4Water.utils.utils import JsonEncoder
 
-try:
-    from AI4Water.hyper_opt.testing import plot_param_importances
-except ModuleNotFoundError:
-    plot_param_importances = None
+# joblib >= 1.3 can return the results of Parallel as a generator instead of a list
+_PARALLEL_KWS = {'return_as': 'generator'} if 'return_as' in inspect.signature(Parallel).parameters else {}
+
+# minor version of skopt, parsed once as it is checked for every instance
+_SKOPT_MINOR = int(skopt.__version__.split('.')[1]) if skopt is not None else 0
 
 # TODO RayTune libraries under the hood https://docs.ray.io/en/master/tune/api_docs/suggestion.html#summary
 # TODO add generic algorithm, deap/pygad
@@ -85,7 +87,7 @@ except ModuleNotFoundError:
 
 SEP = os.sep
 
-ALGORITHMS = {
+ALGORITHMS = MappingProxyType({
     'gp': {'name': 'gaussian_processes', 'backend': ['skopt']},
     'bayes': {},
     'forest': {'name': 'decision_tree', 'backend': ['skopt']},
@@ -95,7 +97,22 @@ ALGORITHMS = {
     'random': {'name': 'random search', 'backend': ['sklearn', 'optuna', 'hyperopt']},
     'grid': {'name': 'grid search', 'backend': ['sklearn', 'optuna']},
     'cmaes': {'name': 'Covariance Matrix Adaptation Evolution Strategy', 'backend': ['optuna']}
-}
+})
+
+_BACKENDS = frozenset(['optuna', 'hyperopt', 'sklearn', 'skopt'])
+
+# backends which can be used with each algorithm, an empty set means any of the backends
+_BACKEND_FOR_ALGO = MappingProxyType({k: frozenset(v.get('backend', ())) for k, v in ALGORITHMS.items()})
+
+# backend used when it is not specified by the user
+_DEFAULT_BACKEND = MappingProxyType({
+    'tpe': 'optuna',
+    'cmaes': 'optuna',
+    'atpe': 'hyperopt',
+    'random': 'sklearn',
+    'grid': 'sklearn',
+    'bayes': 'skopt',
+})
 
 class HyperOpt(object):
     """
@@ -384,7 +401,18 @@ class HyperOpt(object):
             kwargs dict:
                 Any additional keyword arguments will for the underlying optimization
                 algorithm. In case of using AI4Water model, these must be arguments
-                which are passed to AI4Water's Model class.
+                which are passed to AI4Water's Model class. `n_jobs` sets the number
+                of trials which are evaluated in parallel. It is passed to sklearn's
+                search classes, gp_minimize and optuna, while for own grid and random
+                search the trials are run in parallel processes with joblib. It is
+                ignored with hyperopt backend. For bayes with skopt backend,
+                `warm_start_from` can be the `opt_path` of a previous optimization
+                whose evaluated points are then reused. For optuna backend, `storage`
+                and `study_name` can be given to continue a stored study. For gp_minimize,
+                `acq_optimizer` defaults to "sampling" instead of "lbfgs". For long bayes
+                runs, `surrogate` can be set to "RF", "ET" or "GBRT" to use a tree based
+                surrogate model whose fitting cost, unlike that of default "GP", does not
+                grow cubically with the number of iterations.
         """
         if algorithm not in ALGORITHMS:
             raise ValueError(f"""Invalid value of algorithm provided. Allowd values for algorithm"
@@ -392,13 +420,18 @@ class HyperOpt(object):
                                 You provided {algorithm}""")
 
         self.objective_fn = objective_fn
+        # whether objective_fn is an sklearn (or sklearn compatible e.g. xgboost) estimator
+        self.is_sklearn_estimator = isinstance(objective_fn, BaseEstimator)
         self.algorithm = algorithm
         self.backend=backend
         self.param_space=param_space
         self.original_space = param_space       # todo self.space and self.param_space should be combined.
         self.ai4water_args = None
         self.title = self.algorithm
-        self.results = {}  # internally stored results
+        # errors and parameters of each iteration evaluated by this class, in the order of evaluation
+        self._losses = []
+        self._params = []
+        self._ai4water_cache = {}  # errors of ai4water models keyed by their json encoded parameters
         self.gpmin_results = None  #
         self.data = None
         self.eval_on_best=eval_on_best
@@ -406,6 +439,7 @@ class HyperOpt(object):
 
         self.gpmin_args = self.check_args(**kwargs)
 
+        self.optfn = None  # remains None when neither sklearn nor skopt based search class is used
         if self.use_sklearn:
             if self.algorithm == "random":
                 self.optfn = RandomizedSearchCV(estimator=objective_fn, param_distributions=param_space, **kwargs)
@@ -422,63 +456,68 @@ class HyperOpt(object):
     @backend.setter
     def backend(self, x):
         if x is not None:
-            assert x in ['optuna', 'hyperopt', 'sklearn', 'skopt'], f"""
+            assert x in _BACKENDS, f"""
 Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
-        if self.algorithm == 'tpe':
-            if x is None:
-                x = 'optuna'
-            assert x in ['optuna', 'hyperopt']
-        elif self.algorithm == 'cmaes':
-            if x is None:
-                x = 'optuna'
-            assert x == 'optuna'
-        elif self.algorithm == 'atpe':
-            if x is None:
-                x = 'hyperopt'
-            assert x == 'hyperopt'
-        elif self.algorithm == 'random':
-            if x is None:
-                x = 'sklearn'
-            assert x in ['optuna', 'hyperopt', 'sklearn']
-        elif self.algorithm == 'grid':
-            if x is None:
-                x = 'sklearn'
-            assert x in ['sklearn', 'optuna']
-        elif self.algorithm == 'bayes':
-            if x is None:
-                x = 'skopt'
-        else:
+        if self.algorithm not in _DEFAULT_BACKEND:
             raise ValueError
+        if x is None:
+            x = _DEFAULT_BACKEND[self.algorithm]
+        if _BACKEND_FOR_ALGO[self.algorithm]:
+            assert x in _BACKEND_FOR_ALGO[self.algorithm]
         if x == 'hyperopt' and hyperopt is None:
             raise ValueError(f"You must install `hyperopt` to use it as backend for {self.algorithm} algorithm.")
         if x == 'optuna' and optuna is None:
             raise ValueError(f"You must install optuna to use `optuna` as backend for {self.algorithm} algorithm")
         self._backend = x
 
+    @property
+    def results(self)->dict:
+        """internally stored results with errors as keys and parameters as values, in the order
+        of evaluation. If an error occurs more than once, the key of each later occurrence is
+        the next larger float so that all the evaluations are kept."""
+        results = {}
+        for loss, para in zip(self._losses, self._params):
+            while loss in results:
+                loss = float(np.nextafter(loss, np.inf))
+            results[loss] = para
+        return results
+
+    @property
+    def evaluations(self)->dict:
+        """error and parameters of each evaluation keyed by its index in the order of evaluation."""
+        return {idx: {'loss': loss, 'params': para} for idx, (loss, para) in enumerate(zip(self._losses, self._params))}
+
+    def _add_result(self, error, para:dict):
+        self._losses.append(error)
+        self._params.append(para)
+
     @property
     def title(self):
         return self._title
 
     @title.setter
     def title(self, x):
+        # a new time stamp is added at every assignment so that each run gets its own path
         self._title = x + '_' + str(dateandtime_now())
 
     def objective_fn_is_dl(self):
         return False
 
     def check_args(self, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
+        # kwargs is not deep copied because `data` can be a large DataFrame which is only referenced.
+        self.n_jobs = kwargs.get('n_jobs', 1)
 
         self.use_ai4water_model = False
         if "ai4water_args" in kwargs:
-            self.ai4water_args = kwargs.pop("ai4water_args")
-            self.data = kwargs.pop("data")
+            self.ai4water_args = dict(kwargs["ai4water_args"])
+            self.data = kwargs["data"]
+            kwargs = {k: v for k, v in kwargs.items() if k not in ("ai4water_args", "data")}
             self._model = self.ai4water_args.pop("model")
             #self._model = list(_model.keys())[0]
             self.use_ai4water_model = True
 
         if 'n_initial_points' in kwargs:
-            if int(''.join(skopt.__version__.split('.')[1])) < 8:
+            if _SKOPT_MINOR < 8:
                 raise ValueError(f"""
                         'n_initial_points' argument is not available in skopt version < 0.8.
                         However you are using skopt version {skopt.__version__} .
@@ -494,10 +533,15 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         # Since it was not possible to inherit this class from BaseSearchCV and BayesSearchCV at the same time, this
         # hack makes sure that all the functionalities of GridSearchCV, RandomizeSearchCV and BayesSearchCV are also
         # available with class.
-        if hasattr(self.optfn, item):
-            return getattr(self.optfn, item)
-        else:
-            raise AttributeError(f"Attribute {item} not found")
+        # self.__dict__ is used instead of self.optfn so that a missing optfn (e.g. during unpickling/copying)
+        # does not call __getattr__ again.
+        optfn = self.__dict__.get('optfn')
+        if optfn is not None:
+            try:
+                return getattr(optfn, item)
+            except AttributeError:
+                pass
+        raise AttributeError(f"Attribute {item} not found")
 
     @property
     def param_space(self):
@@ -531,20 +575,16 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
             if isinstance(x, dict):
                 _param_space = x
             elif isinstance(x, list):
-                _param_space = {}
-                for _space in x:
-                    assert isinstance(_space, Dimension)
-                    _param_space[_space.name] = _space.grid
+                assert all(isinstance(_space, Dimension) for _space in x)
+                _param_space = {_space.name: _space.grid for _space in x}
             else:
                 raise ValueError
         elif self.algorithm in ['tpe', 'atpe', 'random'] and self.backend == 'hyperopt':
             if isinstance(x, list):
                 # space is provided as list. Either all of them must be hp.space or Dimension.
                 if isinstance(x[0], Dimension):
-                    _param_space = {}
-                    for idx, space in enumerate(x):
-                        assert isinstance(space, Dimension)
-                        _param_space[space.name] = space.as_hp()
+                    assert all(isinstance(space, Dimension) for space in x)
+                    _param_space = {space.name: space.as_hp() for space in x}
                 elif isinstance(x[0], Apply):
                     _param_space = []
                     for idx, space in enumerate(x):
@@ -560,10 +600,8 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         elif self.backend == 'optuna':
             if isinstance(x, list):
-                _param_space = {}
-                for s in x:
-                    assert isinstance(s, Dimension)
-                    _param_space[s.name] = s
+                assert all(isinstance(s, Dimension) for s in x)
+                _param_space = {s.name: s for s in x}
             elif isinstance(x, dict):
                 assert all([isinstance(s, Dimension) for s in x.values()])
                 _param_space = x
@@ -573,13 +611,30 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
             raise ValueError
 
         self._param_space = _param_space
+        # these are made from param_space so they are made again when it changes
+        self.__dict__.pop('_para_order', None)
+        self.__dict__.pop('_dims', None)
 
     def skopt_space(self):
-        """Tries to make skopt compatible Space object. If unsuccessful, return None"""
+        """Tries to make skopt compatible Space object. If unsuccessful, return None.
+        The space is made only once since original_space does not change after initialization."""
+        if '_skopt_space' not in self.__dict__:
+            dims = self._skopt_dimensions()
+            self._skopt_space = dims if dims is None or isinstance(dims, Dimension) else Space(dims)
+        return self._skopt_space
+
+    def _skopt_dimensions(self):
+        """Dimensions from which skopt_space is made. These are also used by space() so that
+        a Space object is not constructed only to be iterated over."""
+        if '_skopt_dims' not in self.__dict__:
+            self._skopt_dims = self._make_skopt_dimensions()
+        return self._skopt_dims
+
+    def _make_skopt_dimensions(self):
         x = self.original_space
         if isinstance(x, list):
             if all([isinstance(s, Dimension) for s in x]):
-                _space = Space(x)
+                _space = list(x)
             elif len(x) == 1 and isinstance(x[0], tuple):
                 if len(x[0]) == 2:
                     if 'int' in x[0][0].__class__.__name__:
@@ -591,7 +646,7 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                 else:
                     raise NotImplementedError
             elif all([isinstance(s, Apply) for s in self.original_space]):
-                _space = Space([skopt_space_from_hp_space(v) for v in self.original_space])
+                _space = [skopt_space_from_hp_space(v) for v in self.original_space]
             else:
                 raise NotImplementedError
         elif isinstance(x, dict):  # todo, in random, should we build Only Categorical space?
@@ -605,7 +660,7 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                     if v.name is None or v.name.startswith('real_') or v.name.startswith('integer_'):
                         v.name = k
                     s = v
-                elif isinstance(v, Apply) or 'rv_frozen' in v.__class__.__name__:
+                elif isinstance(v, Apply) or _is_rv_frozen(v):
                     s = skopt_space_from_hp_space(v, k)
                 elif isinstance(v, tuple) or isinstance(v, list):
                     s = Categorical(v, name=k)
@@ -613,100 +668,115 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                     raise NotImplementedError(f"unknown type {v}, {type(v)}")
                 space_.append(s)
 
-            _space = Space(space_) if len(space_)>0 else None
-        elif 'rv_frozen' in x.__class__.__name__ or isinstance(x, Apply):
-            _space =  Space([skopt_space_from_hp_space(x)])
+            _space = space_ if len(space_)>0 else None
+        elif _is_rv_frozen(x) or isinstance(x, Apply):
+            _space = [skopt_space_from_hp_space(x)]
         else:
             raise NotImplementedError(f"unknown type {x}, {type(x)}")
         return _space
 
     def space(self)->dict:
-        """Returns a skopt compatible space but as dictionary"""
-        if self.backend == 'hyperopt':
-            if isinstance(self.original_space, Apply):
-                _space = skopt_space_from_hp_space(self.original_space)
-                _space = {_space.name: _space}
-            elif isinstance(self.original_space, dict):
-                _space = OrderedDict()
-                for k, v in self.original_space.items():
-                    if isinstance(v, Apply) or 'rv_frozen' in v.__class__.__name__:
-                        _space[k] = skopt_space_from_hp_space(v)
-                    elif isinstance(v, Dimension):
-                        _space[v.name] = v
-                    else:
-                        raise NotImplementedError
-            elif isinstance(self.original_space, list):
-                if  all([isinstance(s, Dimension) for s in self.original_space]):
-                    _space = OrderedDict({s.name:s for s in self.original_space})
-                elif all([isinstance(s, Apply) for s in self.original_space]):
-                    d = [skopt_space_from_hp_space(v) for v in self.original_space]
-                    _space = OrderedDict({s.name:s for s in d})
+        """Returns a skopt compatible space but as dictionary. It is made only once like skopt_space."""
+        if '_space' not in self.__dict__:
+            self._space = self._make_space()
+        return self._space
+
+    def _make_space(self)->dict:
+        # the backend does not change after initialization so the space is built by
+        # the function specific to that backend
+        return {
+            'hyperopt': self._space_for_hyperopt,
+            'optuna': self._space_for_optuna,
+            'skopt': self._space_for_skopt,
+            'sklearn': self._space_for_sklearn,
+        }[self.backend]()
+
+    def _space_for_hyperopt(self)->dict:
+        if isinstance(self.original_space, Apply):
+            _space = skopt_space_from_hp_space(self.original_space)
+            _space = {_space.name: _space}
+        elif isinstance(self.original_space, dict):
+            _space = OrderedDict()
+            for k, v in self.original_space.items():
+                if isinstance(v, Apply) or _is_rv_frozen(v):
+                    _space[k] = skopt_space_from_hp_space(v)
+                elif isinstance(v, Dimension):
+                    _space[v.name] = v
                 else:
                     raise NotImplementedError
+        elif isinstance(self.original_space, list):
+            if  all([isinstance(s, Dimension) for s in self.original_space]):
+                _space = OrderedDict({s.name:s for s in self.original_space})
+            elif all([isinstance(s, Apply) for s in self.original_space]):
+                d = [skopt_space_from_hp_space(v) for v in self.original_space]
+                _space = OrderedDict({s.name:s for s in d})
             else:
                 raise NotImplementedError
-        elif self.backend == 'optuna':
-            if isinstance(self.original_space, list):
-                if all([isinstance(s, Dimension) for s in self.original_space]):
-                    _space = OrderedDict({s.name: s for s in self.original_space})
-                else:
-                    raise NotImplementedError
+        else:
+            raise NotImplementedError
+        return _space
+
+    def _space_for_optuna(self)->dict:
+        if isinstance(self.original_space, list):
+            if all([isinstance(s, Dimension) for s in self.original_space]):
+                _space = OrderedDict({s.name: s for s in self.original_space})
             else:
                 raise NotImplementedError
-        elif self.backend == 'skopt':
-            sk_space = self.skopt_space()
+        else:
+            raise NotImplementedError
+        return _space
+
+    def _space_for_skopt(self)->dict:
+        sk_space = self._skopt_dimensions()
 
-            if isinstance(sk_space, Dimension):
-                _space = {sk_space.name: sk_space}
+        if isinstance(sk_space, Dimension):
+            _space = {sk_space.name: sk_space}
 
-            elif all([isinstance(s, Dimension) for s in sk_space]):
-                _space = OrderedDict()
-                for s in sk_space:
-                    _space[s.name] = s
+        elif all([isinstance(s, Dimension) for s in sk_space]):
+            _space = OrderedDict({s.name: s for s in sk_space})
 
+        else:
+            raise NotImplementedError
+        return _space
+
+    def _space_for_sklearn(self)->dict:
+        if isinstance(self.original_space, list):
+            if all([isinstance(s, Dimension) for s in self.original_space]):
+                _space = OrderedDict({s.name:s for s in self.original_space})
             else:
                 raise NotImplementedError
-        elif self.backend == 'sklearn':
-            if isinstance(self.original_space, list):
-                if all([isinstance(s, Dimension) for s in self.original_space]):
-                    _space = OrderedDict({s.name:s for s in self.original_space})
-                else:
-                    raise NotImplementedError
-            elif isinstance(self.original_space, dict):
-                _space = OrderedDict()
-                for k, v in self.original_space.items():
-                    if isinstance(v, list):
-                        s = space_from_list(v, k)
-                    elif isinstance(v, Dimension):
-                        s = v
-                    elif isinstance(v, tuple) or isinstance(v, list):
-                        s = Categorical(v, name=k)
-                    elif isinstance(v, Apply) or 'rv_frozen' in v.__class__.__name__:
-                        if self.algorithm == 'random':
-                            s = Real(v.kwds['loc'], v.kwds['loc'] + v.kwds['scale'], name=k, prior=v.dist.name)
-                        else:
-                            s = skopt_space_from_hp_space(v)
+        elif isinstance(self.original_space, dict):
+            _space = OrderedDict()
+            for k, v in self.original_space.items():
+                if isinstance(v, list):
+                    s = space_from_list(v, k)
+                elif isinstance(v, Dimension):
+                    s = v
+                elif isinstance(v, tuple) or isinstance(v, list):
+                    s = Categorical(v, name=k)
+                elif isinstance(v, Apply) or _is_rv_frozen(v):
+                    if self.algorithm == 'random':
+                        s = Real(v.kwds['loc'], v.kwds['loc'] + v.kwds['scale'], name=k, prior=v.dist.name)
                     else:
-                        raise NotImplementedError(f"unknown type {v}, {type(v)}")
-                    _space[k] = s
-            else:
-                raise NotImplementedError
+                        s = skopt_space_from_hp_space(v)
+                else:
+                    raise NotImplementedError(f"unknown type {v}, {type(v)}")
+                _space[k] = s
         else:
             raise NotImplementedError
-
         return _space
 
     @property
     def use_sklearn(self):
         # will return True if we are to use sklearn's GridSearchCV or RandomSearchCV
-        if self.algorithm in ["random", "grid"] and "sklearn" in str(type(self.objective_fn)):
+        if self.algorithm in ["random", "grid"] and self.is_sklearn_estimator:
             return True
         return False
 
     @property
     def use_skopt_bayes(self):
         # will return true if we have to use skopt based BayesSearchCV
-        if self.algorithm=="bayes" and "sklearn" in str(type(self.objective_fn)):
+        if self.algorithm=="bayes" and self.is_sklearn_estimator:
             assert not self.use_sklearn
             return True
         return False
@@ -715,7 +785,7 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
     def use_skopt_gpmin(self):
         # will return True if we have to use skopt based gp_minimize function. This is to implement Bayesian on
         # non-sklearn based models
-        if self.algorithm == "bayes" and "sklearn" not in str(type(self.objective_fn)):
+        if self.algorithm == "bayes" and not self.is_sklearn_estimator:
             assert not self.use_sklearn
             assert not self.use_skopt_bayes
             return True
@@ -800,8 +870,7 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         elif self.use_skopt_bayes or self.use_sklearn:
             paras = self.optfn.best_params_
         else:
-            best_y = list(sorted(self.results.keys()))[0]
-            paras = sort_x_iters(self.results[best_y], list(self.param_space.keys()))
+            paras = sort_x_iters(self._params[int(np.argmin(self._losses))], list(self.param_space.keys()))
 
         if as_list:
             return list(paras.values())
@@ -853,7 +922,13 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                      **kwargs):
 
         # this is for it to make json serializable.
-        kwargs = Jsonize(kwargs)()
+        kwargs = {k: _jsonize_param(v) for k, v in kwargs.items()}
+
+        # the same parameters can be suggested more than once e.g. by tpe or in a restarted
+        # optimization, the model is then not built and trained again.
+        key = json.dumps(kwargs, sort_keys=True)
+        if key in self._ai4water_cache and not return_model and not view_model:
+            return self._ai4water_cache[key]
 
         if title is None:
             title =  self.opt_path #self.method + '_' + config.model["problem"] + '_' + config.model["ml_model"]
@@ -878,7 +953,8 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         mse = RegressionMetrics(t, p).mse()
 
         error = round(mse, 7)
-        self.results[error] = sort_x_iters(kwargs, self.original_para_order())
+        self._add_result(error, sort_x_iters(kwargs, self.original_para_order()))
+        self._ai4water_cache[key] = error
 
         print(f"Validation mse {error}")
 
@@ -894,6 +970,13 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         return error
 
     def original_para_order(self):
+        """names of parameters in the order in which they were provided. They are found only
+        once until param_space is set again."""
+        if '_para_order' not in self.__dict__:
+            self._para_order = self._make_para_order()
+        return self._para_order
+
+    def _make_para_order(self):
         if isinstance(self.param_space, dict):
             return list(self.param_space.keys())
         elif self.skopt_space() is not None:
@@ -907,7 +990,9 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
     def dims(self):
         # this will be used for gp_minimize
-        return list(self.param_space)
+        if '_dims' not in self.__dict__:
+            self._dims = list(self.param_space)
+        return self._dims
 
     def model_for_gpmin(self):
         """This function can be called in two cases:
@@ -922,17 +1007,15 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         dims = self.dims()
         if self.use_named_args and self.ai4water_args is None:
             # external function and this function accepts named args.
-            @use_named_args(dimensions=dims)
-            def fitness(**kwargs):
-                return self.objective_fn(**kwargs)
-            return fitness
-
-        if self.use_named_args and self.ai4water_args is not None:
+            fn = self.objective_fn
+        elif self.use_named_args and self.ai4water_args is not None:
             # using in-build ai4water_model as objective function.
-            @use_named_args(dimensions=dims)
-            def fitness(**kwargs):
-                return self.ai4water_model(**kwargs)
-            return fitness
+            fn = self.ai4water_model
+        else:
+            fn = None
+
+        if fn is not None:
+            return _named_args_fn(fn, [dim.name for dim in dims])
 
         raise ValueError(f"used named args is {self.use_named_args}")
 
@@ -940,11 +1023,45 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         kwargs = self.gpmin_args
         if 'num_iterations' in kwargs:
             kwargs['n_calls'] = kwargs.pop('num_iterations')
+        # optimizing the acquisition function with lbfgs restarts becomes the most expensive
+        # part of each iteration as the number of evaluated points grows, so the acquisition
+        # function is minimized over `n_points` randomly sampled points unless asked otherwise.
+        kwargs.setdefault('acq_optimizer', 'sampling')
+        kwargs.setdefault('n_points', 10000)
+
+        surrogate = kwargs.pop('surrogate', 'GP')
+        assert surrogate in ['GP', 'RF', 'ET', 'GBRT'], f"surrogate must be one of GP, RF, ET or GBRT but it is {surrogate}"
+
+        # the points evaluated in a previous run are given to the optimizer as already evaluated points
+        warm_start_from = kwargs.pop('warm_start_from', None)
+        if warm_start_from is not None:
+            if 'x0' in kwargs:
+                warnings.warn("warm_start_from is ignored because x0 is provided")
+            else:
+                x0, y0 = _prior_observations(warm_start_from, self.skopt_space())
+                if x0:
+                    kwargs['x0'], kwargs['y0'] = x0, y0
 
         try:
-            search_result = gp_minimize(func=self.model_for_gpmin(),
-                                        dimensions=self.dims(),
-                                        **kwargs)
+            if self.n_jobs != 1 and not self.use_ai4water_model:
+                if surrogate != 'GP':
+                    kwargs.setdefault('base_estimator', surrogate)
+                search_result = self.gp_minimize_parallel(**kwargs)
+            elif surrogate == 'GP':
+                search_result = gp_minimize(func=self.model_for_gpmin(),
+                                            dimensions=self.dims(),
+                                            **kwargs)
+            else:
+                # tree based minimizers always minimize the acquisition function by sampling
+                kwargs = {k: v for k, v in kwargs.items() if k != 'acq_optimizer'}
+                if surrogate == 'GBRT':
+                    minimize_fn = gbrt_minimize
+                else:
+                    minimize_fn = forest_minimize
+                    kwargs.setdefault('base_estimator', surrogate)
+                search_result = minimize_fn(func=self.model_for_gpmin(),
+                                            dimensions=self.dims(),
+                                            **kwargs)
         except ValueError:
             if int(''.join(sklearn.__version__.split('.')[1]))>22:
                 raise ValueError(f"""
@@ -967,8 +1084,11 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         self.gpmin_results = search_result
 
-        if len(self.results) < 1:
-            self.results = {str(round(k, 8)): self.to_kw(v) for k, v in zip(search_result.func_vals, search_result.x_iters)}
+        if not self._losses:
+            self.to_kw(search_result.x_iters[0])  # finds the names of parameters
+            names = self._space_names
+            for y, x in zip(search_result.func_vals, search_result.x_iters):
+                self._add_result(round(float(y), 8), dict(zip(names, x)))
 
         post_process_skopt_results(search_result, self.results, self.opt_path)
 
@@ -979,27 +1099,127 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         return search_result
 
+    def gp_minimize_parallel(self,
+                             n_calls=100,
+                             n_random_starts=None,
+                             n_initial_points=10,
+                             initial_point_generator="random",
+                             acq_func="gp_hedge",
+                             acq_optimizer="lbfgs",
+                             x0=None,
+                             y0=None,
+                             random_state=None,
+                             base_estimator=None,
+                             n_points=10000,
+                             n_restarts_optimizer=5,
+                             xi=0.01,
+                             kappa=1.96,
+                             noise="gaussian",
+                             model_queue_size=None,
+                             **kwargs):
+        """
+        Bayesian optimization with the same arguments as gp_minimize but in which
+        `n_jobs` points are asked from the optimizer at once using constant liar
+        strategy and evaluated in parallel processes. The surrogate model is
+        fitted once for each batch of points instead of once for each point.
+        `verbose` and `callback` arguments of gp_minimize are not supported and
+        a warning is given if they are provided.
+        """
+        from skopt import Optimizer
+        from skopt.utils import cook_estimator, normalize_dimensions
+
+        # e.g. verbose=False or callback=None are the defaults which do not need to be applied.
+        # n_jobs is also in kwargs but it is used from self.n_jobs.
+        ignored = [k for k, v in kwargs.items()
+                   if k != 'n_jobs' and v is not None and not (isinstance(v, int) and not v)]
+        if ignored:
+            warnings.warn(f"{ignored} are not supported when the points are evaluated in parallel and are ignored")
+
+        rng = check_random_state(random_state)
+        space = normalize_dimensions(self.dims())
+
+        if base_estimator is None:
+            base_estimator = cook_estimator("GP", space=space, random_state=rng.randint(0, np.iinfo(np.int32).max),
+                                            noise=noise)
+        if n_random_starts is not None:  # deprecated in gp_minimize in favour of n_initial_points
+            n_initial_points = n_random_starts
+
+        opt = Optimizer(space, base_estimator,
+                        n_initial_points=n_initial_points,
+                        initial_point_generator=initial_point_generator,
+                        acq_func=acq_func,
+                        acq_optimizer=acq_optimizer,
+                        random_state=rng,
+                        model_queue_size=model_queue_size,
+                        acq_optimizer_kwargs={'n_points': n_points, 'n_restarts_optimizer': n_restarts_optimizer},
+                        acq_func_kwargs={'xi': xi, 'kappa': kappa})
+
+        names = [dim.name for dim in opt.space.dimensions]
+        total_calls = n_calls
+
+        # the same pool of workers is used for all the batches instead of being set up for each batch
+        with Parallel(n_jobs=self.n_jobs, backend='loky') as parallel:
+
+            def evaluate(xs):
+                return parallel(delayed(_eval_gp_point)(self.objective_fn, self.use_named_args, names, x) for x in xs)
+
+            if x0 is not None:
+                if not isinstance(x0[0], (list, tuple)):
+                    x0 = [x0]
+                if y0 is None:
+                    y0 = evaluate(x0)
+                    n_calls -= len(x0)
+                elif np.ndim(y0) == 0:
+                    y0 = [y0]
+                opt.tell(list(x0), list(y0))
+
+            batch_size = effective_n_jobs(self.n_jobs)
+            while n_calls > 0:
+                xs = opt.ask(n_points=min(batch_size, n_calls), strategy='cl_min')
+                opt.tell(xs, evaluate(xs))
+                n_calls -= len(xs)
+
+        search_result = opt.get_result()
+        # same as the specs stored by gp_minimize so that the results can be serialized in the same way
+        search_result.specs = {'function': 'gp_minimize',
+                               'args': {'func': self.objective_fn, 'dimensions': space,
+                                        'base_estimator': base_estimator, 'n_calls': total_calls,
+                                        'n_initial_points': n_initial_points,
+                                        'initial_point_generator': initial_point_generator,
+                                        'acq_func': acq_func, 'acq_optimizer': acq_optimizer, 'x0': x0, 'y0': y0,
+                                        'random_state': random_state, 'n_points': n_points,
+                                        'n_restarts_optimizer': n_restarts_optimizer, 'xi': xi, 'kappa': kappa,
+                                        'noise': noise, 'n_jobs': self.n_jobs,
+                                        'model_queue_size': model_queue_size}}
+        return search_result
+
     def eval_sequence(self, params):
+        """evaluates the objective function at each parameter set in `params`. `params`
+        can be any sized iterable e.g. ParameterGrid, it is iterated over only once so that
+        the parameter sets are not all held in memory. Returns self.results, the evaluations
+        with same loss do not replace each other in it. The exact loss of each evaluation is
+        available from self.evaluations."""
 
         print(f"total number of iterations: {len(params)}")
-        for idx, para in enumerate(params):
-
-            if self.use_ai4water_model:
-                err = self.ai4water_model(**para)
-            elif self.use_named_args:  # objective_fn is external but uses kwargs
-                err = self.objective_fn(**para)
-            else: # objective_fn is external and does not uses keywork arguments
-                try:
-                    err = self.objective_fn(*list(para.values()))
-                except TypeError:
-                    raise TypeError(f"""
-                        use_named_args argument is set to {self.use_named_args}. If your
-                        objective function takes key word arguments, make sure that
-                        this argument is set to True during initiatiation of HyperOpt.""")
+
+        # each iteration is independent of others so an external objective_fn can be evaluated
+        # in parallel processes by providing `n_jobs` to HyperOpt. ai4water_model is always evaluated
+        # sequentially because it stores its results in self.results.
+        if self.n_jobs != 1 and not self.use_ai4water_model:
+            evaluations = Parallel(n_jobs=self.n_jobs, backend='loky', **_PARALLEL_KWS)(
+                delayed(_eval_objective_fn)(self.objective_fn, self.use_named_args, para) for para in params)
+        elif self.use_ai4water_model:
+            evaluations = ((para, self.ai4water_model(**para)) for para in params)
+        else:
+            evaluations = (_eval_objective_fn(self.objective_fn, self.use_named_args, para) for para in params)
+
+        para_order = self.original_para_order()
+        for para, err in evaluations:
+
             err = round(err, 8)
 
             if not self.use_ai4water_model:
-                self.results[err + idx] = sort_x_iters(para, self.original_para_order())
+                self._add_result(err, sort_x_iters(para, para_order))
 
         self._plot()
 
@@ -1010,18 +1230,16 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
     def grid_search(self):
 
-        params = list(ParameterGrid(self.param_space))
-        self.param_grid = params
+        self.param_grid = ParameterGrid(self.param_space)
 
-        return self.eval_sequence(params)
+        return self.eval_sequence(self.param_grid)
 
     def random_search(self):
 
-        param_list = list(ParameterSampler(self.param_space, n_iter=self.num_iterations,
-                                           random_state=self.random_state))
-        self.param_grid = param_list
+        self.param_grid = ParameterSampler(self.param_space, n_iter=self.num_iterations,
+                                           random_state=self.random_state)
 
-        return self.eval_sequence(param_list)
+        return self.eval_sequence(self.param_grid)
 
     def optuna_objective(self, **kwargs):
 
@@ -1038,12 +1256,29 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                     suggestion[space_name] = _space.suggest(trial)
             return self.objective_fn(**suggestion)
 
+        # a study saved in `storage` under `study_name` is continued
+        study_kws = {'storage': self.gpmin_args.get('storage'),
+                     'study_name': self.gpmin_args.get('study_name'),
+                     'load_if_exists': True}
+        sampler_kws = {}
+        if self.n_jobs != 1:
+            # optuna runs the parallel trials in threads of the same process
+            warnings.warn("with n_jobs != 1, objective_fn is called from multiple threads so it must be thread safe")
+            if self.algorithm == 'tpe' and 'constant_liar' in inspect.signature(optuna.samplers.TPESampler).parameters:
+                # trials which are still running are considered as bad so that parallel trials are not all
+                # suggested close to each other.
+                sampler_kws['constant_liar'] = True
+
         if self.algorithm in ['tpe', 'cmaes', 'random']:
-            study = optuna.create_study(direction='minimize', sampler=sampler[self.algorithm]())
+            study = optuna.create_study(direction='minimize', sampler=sampler[self.algorithm](**sampler_kws), **study_kws)
         else:
             space = {s.name:s.grid for s in self.skopt_space()}
-            study = optuna.create_study(sampler=sampler[self.algorithm](space))
-        study.optimize(objective, n_trials=self.num_iterations)
+            study = optuna.create_study(sampler=sampler[self.algorithm](space), **study_kws)
+
+        n_trials = self.num_iterations
+        if n_trials is not None:  # only the remaining trials of a continued study are run
+            n_trials = max(n_trials - len(study.trials), 0)
+        study.optimize(objective, n_trials=n_trials, n_jobs=self.n_jobs)
         setattr(self, 'study', study)
 
         self._plot()
@@ -1060,7 +1295,8 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
             suggest_options.update({'atpe': atpe.suggest})
 
         trials = Trials()
-        model_kws = self.gpmin_args
+        # hyperopt's fmin evaluates trials sequentially and does not accept n_jobs
+        model_kws = {k: v for k, v in self.gpmin_args.items() if k != 'n_jobs'}
         if 'num_iterations' in model_kws:
             model_kws['max_evals'] = model_kws.pop('num_iterations')
 
@@ -1087,12 +1323,31 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
             else:
                 raise NotImplementedError
 
-        best = fmin_hyperopt(objective_f,
-                    space=space,
-                    algo=suggest_options[self.algorithm],
-                    trials=trials,
-                    **kwargs,
-                    **model_kws)
+        # each trial is appended to trials.jsonl as soon as it is evaluated, so the progress is
+        # not lost if the optimization is interrupted.
+        trials_fp = open(os.path.join(self.opt_path, 'trials.jsonl'), 'ab')
+
+        def logged_objective_f(kws):
+            loss = objective_f(kws)
+            # the objective can return a dictionary with other results e.g. attachments which
+            # need not be json serializable, so only the loss and status of trial are logged.
+            if isinstance(loss, dict):
+                record = {'params': kws, 'loss': loss.get('loss'), 'status': loss.get('status')}
+            else:
+                record = {'params': kws, 'loss': loss}
+            trials_fp.write(json_line(record))
+            trials_fp.flush()
+            return loss
+
+        try:
+            best = fmin_hyperopt(logged_objective_f,
+                        space=space,
+                        algo=suggest_options[self.algorithm],
+                        trials=trials,
+                        **kwargs,
+                        **model_kws)
+        finally:
+            trials_fp.close()
 
         with open(os.path.join(self.opt_path, 'trials.json'), "w") as fp:
             json.dump(Jsonize(trials.trials)(), fp, sort_keys=True, indent=4, cls=JsonEncoder)
@@ -1116,10 +1371,20 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
     def hp_space(self):
         """returns a dictionary whose values are hyperopt equivalent space instances."""
-        return {k:v.as_hp() for k,v in self.space().items()}
+        if '_hp_space' not in self.__dict__:
+            self._hp_space = {k:v.as_hp() for k,v in self.space().items()}
+        return self._hp_space
+
+    def _xy_pairs(self)->list:
+        """loss and parameters of each iteration as tuples"""
+        if self.backend not in ("optuna", "hyperopt", "skopt"):
+            return list(zip(self._losses, self._params))
+        return list(self.xy_of_iterations().items())
 
     def xy_of_iterations(self)->dict:
         # todo, not in original order
+        if '_xy_cache' in self.__dict__:  # set while plotting
+            return self._xy_cache
         if self.backend == "optuna":
             return {trial.value:trial.params for trial in self.study.trials}
         elif self.backend == "hyperopt":
@@ -1138,14 +1403,17 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         elif self.backend == 'optuna':
             return [s.values for s in self.study.trials]
         else:
-            return np.array(list(self.results.keys()), dtype=np.float32)
+            return np.asarray(self._losses, dtype=np.float32)
 
     def skopt_results(self):
         if self.use_own and self.algorithm == "bayes" and self.backend == 'skopt':
             return self.gpmin_results
         else:
+            # parameters are taken from the same source as func_vals so that both are aligned
+            params = self._params if self._losses else self.xy_of_iterations().values()
+
             class SR:
-                x_iters = [list(s.values()) for s in self.xy_of_iterations().values()]
+                x_iters = [list(s.values()) for s in params]
                 func_vals = self.func_vals()
                 space = self.skopt_space()
                 if isinstance(self.best_paras(), list):
@@ -1167,6 +1435,17 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         return paras
 
     def _plot(self):
+        # the iterations are found only once and then used by all the files and plots made here
+        self._xy_cache = self.xy_of_iterations()
+        try:
+            self._make_plots()
+        finally:
+            del self._xy_cache
+
+    def _make_plots(self):
+        # plotting libraries are imported here so that importing this module stays cheap
+        import matplotlib.pyplot as plt
+        from skopt.plots import plot_convergence, plot_evaluations
 
         self.save_iterations_as_xy()
 
@@ -1199,9 +1478,11 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         self.plot_importance(raise_error=False)
 
+        plotly = _import_plotly()
         if plotly is not None:
 
             if self.backend == 'optuna':
+                from optuna.visualization import plot_edf, plot_parallel_coordinate, plot_contour
 
                 fig = plot_parallel_coordinate(self.study)
                 plotly.offline.plot(fig, filename=os.path.join(self.opt_path, 'parallel_coordinates.html'),auto_open=False)
@@ -1217,6 +1498,7 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
     def plot_importance(self, raise_error=True):
 
         msg = "You must optuna and plotly installed to get hyper-parameter importance."
+        plotly = _import_plotly()
         if plotly is None or optuna is None:
             if raise_error:
                 raise ModuleNotFoundError(msg)
@@ -1224,6 +1506,9 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                 warnings.warn(msg)
 
         else:
+            import matplotlib.pyplot as plt
+            from AI4Water.hyper_opt.testing import plot_param_importances
+
             importances, importance_paras, fig = plot_param_importances(self.optuna_study())
             if importances is not None:
                 plotly.offline.plot(fig, filename=os.path.join(self.opt_path, 'fanova_importance.html'),
@@ -1244,21 +1529,13 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         return
 
     def to_kw(self, x):
-        names = []
-        if isinstance(self.space(), dict):
-            for key in self.space().keys():
-                names.append(key)
-        else:
-            raise NotImplementedError
-
-        xkv = {}
-        if names is not None:
-            for name, val in zip(names, x):
-                xkv[name] = val
-        else:
-            xkv = x
+        # names of parameters are found only once since space() does not change
+        if '_space_names' not in self.__dict__:
+            if not isinstance(self.space(), dict):
+                raise NotImplementedError
+            self._space_names = tuple(self.space().keys())
 
-        return xkv
+        return dict(zip(self._space_names, x))
 
     def eval_with_best(self,
                        return_model=False,
@@ -1368,23 +1645,30 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                 self._distributions = distributions
                 self.distributions = distributions
 
-        class _Study(Study):
+        class _Trials(Sequence):
+            """trials made from the iterations only when they are accessed. All the trials
+            share the same distributions."""
+            def __init__(self, iterations:list, distributions:dict):
+                self.iterations = iterations
+                self.distributions = distributions
 
-            trials = []
-            idx = 0
+            def __len__(self):
+                return len(self.iterations)
 
-            distributions = {sn:s.to_optuna() for sn, s in self.space().items()}
+            def __getitem__(self, idx):
+                if isinstance(idx, slice):
+                    return [self[i] for i in range(*idx.indices(len(self)))]
+                if idx < 0:
+                    idx += len(self)
+                _y, _x = self.iterations[idx]
+                assert isinstance(_x, dict), f'params must of type dict but provided params are of type {_x.__class__.__name__}'
+                return _Trial(number=idx, values=_y, params=_x, distributions=self.distributions)
 
-            for _y, _x in self.xy_of_iterations().items():
+        class _Study(Study):
 
-                assert isinstance(_x, dict), f'params must of type dict but provided params are of type {_x.__class__.__name__}'
+            distributions = {sn:s.to_optuna() for sn, s in self.space().items()}
 
-                trials.append(_Trial(number=idx,
-                                     values=_y,
-                                     params=_x,
-                                     distributions=distributions
-                                     ))
-                idx += 1
+            trials = _Trials(self._xy_pairs(), distributions)
             best_params = self.best_paras()
             best_trial = None
             best_value = None
@@ -1407,15 +1691,132 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         iterations = self.xy_of_iterations()
 
-        jsonized_iterations = Jsonize(iterations)()
+        # the files are not written again if no iteration has been added since they were last written
+        if self.__dict__.get('_n_saved_iterations') == len(iterations):
+            return
 
-        fname = os.path.join(self.opt_path, "iterations.json")
-        with open(fname, "w") as fp:
-            json.dump(jsonized_iterations, fp, sort_keys=True, indent=4, cls=JsonEncoder)
+        jsonized_iterations = Jsonize(iterations)()
 
-        fname = os.path.join(self.opt_path, "iterations_sorted.json")
-        with open(fname, "w") as fp:
-            json.dump(dict(sorted(jsonized_iterations.items())), fp, sort_keys=True, indent=4, cls=JsonEncoder)
+        # iterations.json keeps the order in which the iterations were evaluated
+        with open(os.path.join(self.opt_path, "iterations.json"), "w") as fp:
+            fp.write(json_dumps(jsonized_iterations))
+
+        with open(os.path.join(self.opt_path, "iterations_sorted.json"), "w") as fp:
+            fp.write(json_dumps(dict(sorted(jsonized_iterations.items()))))
+
+        self._n_saved_iterations = len(iterations)
+
+
+def json_dumps(obj:dict) -> str:
+    """serializes `obj` with an indent of 4. The order of keys in `obj` is preserved while
+    the keys of dictionaries nested in it are sorted."""
+    return json.dumps({k: _sort_keys(v) for k, v in obj.items()}, indent=4, cls=JsonEncoder)
+
+
+def _sort_keys(obj):
+    if isinstance(obj, dict):
+        return {k: _sort_keys(obj[k]) for k in sorted(obj)}
+    return obj
+
+
+def json_line(obj) -> bytes:
+    """serializes `obj` as a single line of json, ending with a newline, to be appended to a jsonl file."""
+    return (json.dumps(obj, sort_keys=True, cls=JsonEncoder) + '\n').encode('utf-8')
+
+
+def _jsonize_param(v):
+    """converts the value of one parameter to a json serializable type. Parameter values
+    are mostly scalars, which are converted directly and only other values go through Jsonize."""
+    if type(v) in (int, float, str, bool, type(None)):
+        return v
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, np.floating):
+        return float(v)
+    return Jsonize(v).stage2(v)
+
+
+def _is_rv_frozen(v)->bool:
+    """whether `v` is a frozen scipy distribution e.g. scipy.stats.uniform(0, 1)"""
+    if rv_frozen is not None:
+        return isinstance(v, rv_frozen)
+    return 'frozen' in v.__class__.__name__
+
+
+def _prior_observations(opt_path:str, space)->tuple:
+    """x and y values of a bayesian optimization whose results were saved in `opt_path`.
+    The points are arranged in the order of dimensions of `space` and only those points
+    are returned which lie within `space`."""
+    fpath = os.path.join(opt_path, os.path.basename(os.path.normpath(opt_path)))
+    if not os.path.exists(fpath):
+        warnings.warn(f"No results of a previous optimization found at {fpath}")
+        return [], []
+
+    try:
+        prev = skopt.load(fpath)
+    except Exception as e:
+        raise ValueError(f"""
+The results of previous optimization at {fpath} could not be loaded to warm start from them.
+The file may have been written only partially, delete it or provide x0 and y0 instead.""") from e
+    prev_names = [dim.name for dim in prev.space.dimensions]
+    names = [dim.name for dim in space.dimensions]
+
+    x0, y0 = [], []
+    if not set(names).issubset(prev_names):
+        warnings.warn(f"The parameters {names} were not all optimized in {opt_path}")
+        return x0, y0
+
+    for x, y in zip(prev.x_iters, prev.func_vals):
+        point = dict(zip(prev_names, x))
+        x = [point[name] for name in names]
+        if x in space:
+            x0.append(x)
+            y0.append(float(y))
+    return x0, y0
+
+
+def _named_args_fn(fn, names:list):
+    """Returns a function which receives the list of values suggested by gp_minimize and calls
+    `fn` with them as keyword arguments. It does the same as skopt's use_named_args but the
+    names are found only once instead of at every call."""
+    names = tuple(names)
+
+    @functools.wraps(fn)
+    def fitness(x):
+        return fn(**dict(zip(names, x)))
+    return fitness
+
+
+def _eval_gp_point(objective_fn, use_named_args:bool, names:list, x:list):
+    """evaluates external objective_fn at point `x` suggested by skopt's Optimizer"""
+    if use_named_args:
+        return objective_fn(**dict(zip(names, x)))
+    return objective_fn(x)
+
+
+def _eval_objective_fn(objective_fn, use_named_args:bool, para:dict)->tuple:
+    """evaluates external objective_fn at `para` and returns `para` along with the
+    error. It is defined at module level so that it can be sent to other processes by joblib."""
+    if use_named_args:  # objective_fn is external but uses kwargs
+        return para, objective_fn(**para)
+    # objective_fn is external and does not uses keywork arguments
+    try:
+        return para, objective_fn(*list(para.values()))
+    except TypeError:
+        raise TypeError(f"""
+            use_named_args argument is set to {use_named_args}. If your
+            objective function takes key word arguments, make sure that
+            this argument is set to True during initiatiation of HyperOpt.""")
+
+
+def _import_plotly():
+    """Imports plotly only when something is to be plotted with it. Returns None if
+    it is not installed."""
+    try:
+        import plotly
+    except ImportError:
+        plotly = None
+    return plotly
 
 
 def space_from_list(v:list, k:str)->Dimension:
@@ -3,6 +3,7 @@ import json
 from skopt.utils import dump
 from itertools import islice
 from pickle import PicklingError
+from typing import Union
 
 import numpy as np
 import pandas as pd
@@ -242,6 +243,10 @@ def x_iter_for_tpe(trials, param_space:dict, as_list=True):
 
     assert isinstance(param_space, dict)
 
+    # the parameters which are hp.choice and the order of parameters are same for all the trials
+    choices = {para for para, space in param_space.items() if is_choice(space)}
+    order = list(param_space.keys())
+
     x_iters = []  # todo, remove x_iters, it is just values of iterations
     iterations = {}
     for t in trials.trials:
@@ -249,7 +254,7 @@ def x_iter_for_tpe(trials, param_space:dict, as_list=True):
         vals = t['misc']['vals']
         y = t['result']['loss']
 
-        _iter = get_one_tpe_x_iter(vals, param_space)
+        _iter = _tpe_x_iter(vals, param_space, choices, order)
         iterations[y] = _iter
 
         x_iters.append(_iter)
@@ -262,29 +267,31 @@ def x_iter_for_tpe(trials, param_space:dict, as_list=True):
 
 def get_one_tpe_x_iter(tpe_vals, param_space:dict, sort=True):
 
+    choices = {para for para in tpe_vals if is_choice(param_space[para])}
+
+    return _tpe_x_iter(tpe_vals, param_space, choices, list(param_space.keys()) if sort else None)
+
+
+def _tpe_x_iter(tpe_vals, param_space:dict, choices:set, order:Union[list, None]):
+
     x_iter = {}
     for para, para_val in tpe_vals.items():
-        if is_choice(param_space[para]):
+        if para in choices:
             hp_assign = {para: para_val[0]}
             cval = space_eval(param_space[para], hp_assign)
             x_iter[para] = cval
         else:
             x_iter[para] = para_val[0]
 
-    if sort:
-        x_iter = sort_x_iters(x_iter, list(param_space.keys()))
+    if order is not None:
+        x_iter = sort_x_iters(x_iter, order)
 
     return x_iter
 
 
 def sort_x_iters(x_iter:dict, original_order:list):
     # the values in x_iter may not be sorted as the parameters provided in original order
-
-    new_x_iter = {}
-    for s in original_order:
-        new_x_iter[s] = x_iter[s]
-
-    return new_x_iter
+    return {s: x_iter[s] for s in original_order}
 
 
 def skopt_space_from_hp_spaces(hp_space:dict)->list:
@@ -510,10 +517,15 @@ def post_process_skopt_results(skopt_results, results, opt_path):
         clear_weights(results=results, opt_dir=opt_path)
         clear_weights(opt_dir=opt_path)
 
+    # the objective function is not stored because local functions e.g. of keyword arguments
+    # can not be pickled and it is not needed to warm start a later optimization from these results.
+    fpath = os.path.join(opt_path, os.path.basename(opt_path))
     try:
-        dump(skopt_results, os.path.join(opt_path, os.path.basename(opt_path)))
-    except PicklingError:
+        dump(skopt_results, fpath, store_objective=False)
+    except (PicklingError, AttributeError, TypeError):
         print("could not pickle results")
+        if os.path.exists(fpath):  # a partially written file can not be loaded
+            os.remove(fpath)
 
     try:
         with open(fname + '.json', 'w') as fp:
@@ -769,9 +781,14 @@ class SerializeSKOptResults(object):
         args['dimensions'] = self.space()
 
         be = self.results['specs']['args']['base_estimator']
-        b_e = {k: Jsonize(v)() for k, v in be.__dict__.items() if
+        if isinstance(be, str):  # e.g. "RF" or "ET" for forest_minimize
+            b_e = be
+        elif hasattr(be, 'kernel'):
+            b_e = {k: Jsonize(v)() for k, v in be.__dict__.items() if
                                        k in ['noise', 'alpha', 'optimizer', 'n_restarts_optimizer', 'normalize_y', 'copy_X_train', 'random_state']}
-        b_e['kernel'] = self.kernel(be.kernel)
+            b_e['kernel'] = self.kernel(be.kernel)
+        else:
+            b_e = self.estimator(be)
 
         args['base_estimator'] = b_e
 
@@ -795,11 +812,19 @@ class SerializeSKOptResults(object):
                          '_rng', 'n_features_in', '_y_tain_mean', '_y_train_std', 'X_train', 'y_train', 'log_marginal_likelihood',
                          'L_', 'K_inv', 'alpha', 'noise_', 'K_inv_', 'y_train_std_', 'y_train_mean_']}
 
-            mod['kernel'] = self.kernel(model.kernel)
-            mods.append({model.__class__.__name__: mod})
+            if hasattr(model, 'kernel'):
+                mod['kernel'] = self.kernel(model.kernel)
+                mods.append({model.__class__.__name__: mod})
+            else:  # tree based models e.g. random forest don't have a kernel
+                mods.append(self.estimator(model))
 
         return mods
 
+    @staticmethod
+    def estimator(model)->dict:
+        """Serializes a model other than gaussian process with its class name and parameters"""
+        return {model.__class__.__name__: {k: Jsonize(v)() for k, v in model.get_params(deep=False).items()}}
+
 
 def scatterplot_matrix_colored(params_names:list,
                                params_values:list,
@@ -58,10 +58,10 @@ class HARHNModel(Model):
             y_pred = y_pred.squeeze(1)
             l = self.loss(y_pred, batch_y)
             l.backward()
-            mse_train += l.item() * batch_x.shape[0]
+            mse_train += l.detach() * batch_x.shape[0]
             self.opt.step()
 
-        return mse_train
+        return float(mse_train)
 
     def train_epoch_v1(self, data_loader):
         # using previous observations as input
@@ -75,10 +75,10 @@ class HARHNModel(Model):
             y_pred = y_pred.squeeze(1)
             l = self.loss(y_pred, batch_y)
             l.backward()
-            mse_train += l.item() * batch_x.shape[0]
+            mse_train += l.detach() * batch_x.shape[0]
             self.opt.step()
 
-        return mse_train
+        return float(mse_train)
 
     def eval_epoch_v1(self, data_loader):
         mse_val = 0
@@ -92,9 +92,9 @@ class HARHNModel(Model):
             output = output.squeeze(1)
             preds.append(output.detach().cpu().numpy())
             true.append(batch_y.detach().cpu().numpy())
-            mse_val += self.loss(output, batch_y).item() * batch_x.shape[0]
+            mse_val += self.loss(output, batch_y) * batch_x.shape[0]
 
-        return true, preds, mse_val
+        return true, preds, float(mse_val)
 
     def eval_epoch_v2(self, data_loader):
         mse_val = 0
@@ -110,9 +110,9 @@ class HARHNModel(Model):
             output = output.squeeze(1)
             preds.append(output.detach().cpu().numpy())
             true.append(batch_y.detach().cpu().numpy())
-            mse_val += self.loss(output, batch_y).item() * batch_x.shape[0]
+            mse_val += self.loss(output, batch_y) * batch_x.shape[0]
 
-        return true, preds, mse_val
+        return true, preds, float(mse_val)
 
     def train(self, st=0, en=None, indices=None, **callbacks):
 
@@ -120,23 +120,16 @@ class HARHNModel(Model):
 
         x_tr, x_val, y_his_tr, y_his_val, target_tr, target_val = train_test_split(x, y_his, target,
                                                                                    test_size=self.config['val_fraction'])
-        self.min_max = {
-            'x_max': x_tr.max(axis=0),
-            'x_min': x_tr.min(axis=0),
-            'y_his_max': y_his_tr.max(axis=0),
-            'y_his_min': y_his_tr.min(axis=0),
-            'target_max': target_tr.max(axis=0),
-            'target_min': target_tr.min(axis=0)
-        }
+        self.min_max = min_max_stats(x=x_tr, y_his=y_his_tr, target=target_tr)
 
-        x_train = (x_tr - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
-        x_val = (x_val - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
+        x_train = scale(x_tr, self.min_max, 'x')
+        x_val = scale(x_val, self.min_max, 'x')
 
-        y_his_train = (y_his_tr - self.min_max['y_his_min']) / (self.min_max['y_his_max'] - self.min_max['y_his_min'])
-        y_his_val = (y_his_val - self.min_max['y_his_min']) / (self.min_max['y_his_max'] - self.min_max['y_his_min'])
+        y_his_train = scale(y_his_tr, self.min_max, 'y_his')
+        y_his_val = scale(y_his_val, self.min_max, 'y_his')
 
-        target_train = (target_tr - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
-        target_val = (target_val - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
+        target_train = scale(target_tr, self.min_max, 'target')
+        target_val = scale(target_val, self.min_max, 'target')
 
         x_train_t = to_torch_tensor(x_train)
         x_val_t = to_torch_tensor(x_val)
@@ -175,8 +168,11 @@ class HARHNModel(Model):
             preds = np.concatenate(preds)
             true = np.concatenate(true)
 
-            if min_val_loss > mse_val ** 0.5:
-                min_val_loss = mse_val ** 0.5
+            train_loss = (mse_train / len(x_train_t)) ** 0.5
+            val_loss = (mse_val / len(x_val_t)) ** 0.5
+
+            if min_val_loss > val_loss:
+                min_val_loss = val_loss
                 print("Saving...")
                 self.saved_model = os.path.join(self.path, "harhn_nasdaq.pt")
                 torch.save(self.pt_model.state_dict(), self.saved_model)
@@ -187,14 +183,12 @@ class HARHNModel(Model):
             if counter == self.config['patience']:
                 print("Training is stopped because patience reached")
                 break
-            train_loss = (mse_train / len(x_train_t)) ** 0.5
-            val_loss = (mse_val / len(x_val_t)) ** 0.5
             losses['train_loss'].append(train_loss)
             losses['val_loss'].append(val_loss)
             print("Iter: ", i, "train: ", train_loss, "val: ", val_loss)
             if i % 10 == 0:
-                preds = preds * (self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
-                true = true * (self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
+                preds = unscale(preds, self.min_max, 'target')
+                true = unscale(true, self.min_max, 'target')
 
                 self.process_results(true, preds.reshape(-1,1), 'validation_' + str(i))
 
@@ -202,9 +196,9 @@ class HARHNModel(Model):
 
     def predict(self, st=0, ende=None, indices=None, data=None, **kwargs):
         x_test, y_his_test, target_test = self.prepare_batches(self.data[st:ende], '',  self.outs)
-        x_test = (x_test - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
-        y_his_test = (y_his_test - self.min_max['y_his_min']) / (self.min_max['y_his_max'] - self.min_max['y_his_min'])
-        target_test = (target_test - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
+        x_test = scale(x_test, self.min_max, 'x')
+        y_his_test = scale(y_his_test, self.min_max, 'y_his')
+        target_test = scale(target_test, self.min_max, 'target')
 
         x_test_t = to_torch_tensor(x_test)
         y_his_test_t = to_torch_tensor(y_his_test)
@@ -224,8 +218,8 @@ class HARHNModel(Model):
         preds = np.concatenate(preds)
         true = np.concatenate(true)
 
-        preds = preds*(self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
-        true = true*(self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
+        preds = unscale(preds, self.min_max, 'target')
+        true = unscale(true, self.min_max, 'target')
 
         self.process_results(true, preds, 'validation_')
 
@@ -264,17 +258,12 @@ class IMVLSTMModel(HARHNModel):
             x = np.dstack([x, y_h])
         x_train, x_val, target_train, target_val = train_test_split(x, target, test_size=self.config['val_fraction'])
 
-        self.min_max = {
-            'x_max': x_train.max(axis=0),
-            'x_min': x_train.min(axis=0),
-            'target_max': target_train.max(axis=0),
-            'target_min': target_train.min(axis=0)
-        }
+        self.min_max = min_max_stats(x=x_train, target=target_train)
 
-        x_train = (x_train - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
-        target_train = (target_train - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
-        x_val = (x_val - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
-        target_val = (target_val - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
+        x_train = scale(x_train, self.min_max, 'x')
+        target_train = scale(target_train, self.min_max, 'target')
+        x_val = scale(x_val, self.min_max, 'x')
+        target_val = scale(target_val, self.min_max, 'target')
 
         x_train_t = to_torch_tensor(x_train)
         target_train_t = to_torch_tensor(target_train)
@@ -300,7 +289,7 @@ class IMVLSTMModel(HARHNModel):
                 y_pred = y_pred.squeeze(1)
                 l = self.loss(y_pred, batch_y)
                 l.backward()
-                mse_train += l.item() * batch_x.shape[0]
+                mse_train += l.detach() * batch_x.shape[0]
                 self.opt.step()
             self.epoch_scheduler.step()
             with torch.no_grad():
@@ -314,9 +303,10 @@ class IMVLSTMModel(HARHNModel):
                     output = output.squeeze(1)
                     preds.append(output.detach().cpu().numpy())
                     true.append(batch_y.detach().cpu().numpy())
-                    mse_val += self.loss(output, batch_y).item() * batch_x.shape[0]
+                    mse_val += self.loss(output, batch_y) * batch_x.shape[0]
             pred = np.concatenate(preds)
             true = np.concatenate(true)
+            mse_train, mse_val = float(mse_train), float(mse_val)
 
             if counter == self.config['patience']:
                 break
@@ -337,8 +327,8 @@ class IMVLSTMModel(HARHNModel):
 
             if self.verbosity > 1:
                 if epoch % 10 == 0:
-                    pred = pred * (self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
-                    true = true * (self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
+                    pred = unscale(pred, self.min_max, 'target')
+                    true = unscale(true, self.min_max, 'target')
 
                     self.process_results([true], [pred], str(epoch))
 
@@ -354,8 +344,8 @@ class IMVLSTMModel(HARHNModel):
         if not self.use_predicted_output:
             x_test = np.dstack([x_test, y_h])
 
-        x_test = (x_test - self.min_max['x_min']) / (self.min_max['x_max'] - self.min_max['x_min'])
-        target_test = (target_test - self.min_max['target_min']) / (self.min_max['target_max'] - self.min_max['target_min'])
+        x_test = scale(x_test, self.min_max, 'x')
+        target_test = scale(target_test, self.min_max, 'target')
 
         x_test_t = to_torch_tensor(x_test)
         target_test_t = to_torch_tensor(target_test)
@@ -378,12 +368,12 @@ class IMVLSTMModel(HARHNModel):
                 true.append(batch_y.detach().cpu().numpy())
                 self.alphas.append(a.detach().cpu().numpy())
                 self.betas.append(b.detach().cpu().numpy())
-                mse_val += self.loss(output, batch_y).item()*batch_x.shape[0]
+                mse_val += self.loss(output, batch_y) * batch_x.shape[0]
         preds = np.concatenate(preds)
         true = np.concatenate(true)
 
-        preds = preds*(self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
-        true = true*(self.min_max['target_max'] - self.min_max['target_min']) + self.min_max['target_min']
+        preds = unscale(preds, self.min_max, 'target')
+        true = unscale(true, self.min_max, 'target')
 
         self.process_results([true], [preds], 'validation')
 
@@ -422,5 +412,26 @@ class IMVLSTMModel(HARHNModel):
         self.plot_feature_importance(betas)
 
 
+def min_max_stats(**arrays) -> dict:
+    """min, max and range along first axis of each array. The range is stored as well so
+    that it is computed only once instead of each time the data is scaled or unscaled."""
+    stats = {}
+    for name, array in arrays.items():
+        stats[name + '_min'] = array.min(axis=0)
+        stats[name + '_max'] = array.max(axis=0)
+        stats[name + '_range'] = stats[name + '_max'] - stats[name + '_min']
+    return stats
+
+
+def scale(array, min_max: dict, name: str):
+    return (array - min_max[name + '_min']) / min_max[name + '_range']
+
+
+def unscale(array, min_max: dict, name: str):
+    return array * min_max[name + '_range'] + min_max[name + '_min']
+
+
 def to_torch_tensor(array):
-    return torch.Tensor(array)
+    """float32 tensor sharing memory with `array` when it is already a contiguous float32
+    array, so the data is not copied once more before being wrapped in a TensorDataset."""
+    return torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32))
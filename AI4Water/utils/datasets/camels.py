@@ -3,22 +3,12 @@ import glob
 import random
 from typing import Union
 
-try:
-    import netCDF4
-except ModuleNotFoundError:
-    netCDF4 = None
-
 import numpy as np
 import pandas as pd
 
 from .datasets import Datasets
 from .utils import check_attributes, download, sanity_check
 
-try:  # shapely may not be installed, as it may be difficult to isntall and is only needed for plotting data.
-    from AI4Water.utils.spatial_utils import plot_shapefile
-except ModuleNotFoundError:
-    plot_shapefile = None
-
 
 SEP = os.sep
 
@@ -459,6 +449,7 @@ class HYSETS(Camels):
         st, en = self._check_length(st, en)
         attrs = check_attributes(dynamic_attributes, self.dynamic_attributes)
 
+        import netCDF4  # imported here because it is slow to import and only needed for HYSETS
         nc = netCDF4.Dataset(os.path.join(self.ds_dir, f'HYSETS_2020_{self.source}.nc'))
 
         stn_df = pd.DataFrame(columns=attrs)
@@ -1181,11 +1172,13 @@ class CAMELS_AUS(Camels):
         f1 = os.path.join(self.ds_dir, f'02_location_boundary_area{SEP}02_location_boundary_area{SEP}shp{SEP}CAMELS_AUS_BasinOutlets_adopted.shp')
         f2 = os.path.join(self.ds_dir, f'02_location_boundary_area{SEP}02_location_boundary_area{SEP}shp{SEP}bonus data{SEP}Australia_boundaries.shp')
 
-        if plot_shapefile is not None:
-            return plot_shapefile(f1, bbox_shp=f2, recs=stations, rec_idx=0, **kwargs)
-        else:
+        try:  # shapely may not be installed, as it may be difficult to isntall and is only needed for plotting data.
+            from AI4Water.utils.spatial_utils import plot_shapefile
+        except ModuleNotFoundError:
             raise ModuleNotFoundError("Shapely must be installed in order to plot the datasets.")
 
+        return plot_shapefile(f1, bbox_shp=f2, recs=stations, rec_idx=0, **kwargs)
+
 
 class CAMELS_CL(Camels):
     """
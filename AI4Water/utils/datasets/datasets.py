@@ -167,38 +167,25 @@
 # https://zenodo.org/record/1157344#.YExnqNyRWUk
 
 
-import glob
 import random
+import functools
+import contextlib
+import multiprocessing
+import importlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import tarfile
 import zipfile
 import warnings
+import subprocess
 import shutil, os
 from typing import Union
 
-try:
-    import netCDF4
-except ModuleNotFoundError:
-    netCDF4 = None
-
-try:
-    import shapefile
-except ModuleNotFoundError:
-    shapefile = None
-
-try:
-    from shapely.geometry import shape, mapping
-    from shapely.ops import unary_union
-except ModuleNotFoundError:
-    shape, mapping, unary_union = None, None, None
-
-try:
-    import fiona
-except ModuleNotFoundError:
-    fiona = None
-
 import numpy as np
 import pandas as pd
 
-from AI4Water.utils.spatial_utils import find_records
+# netCDF4, xarray, shapefile, shapely, fiona and rtree are optional and heavy to import,
+# so they are imported only inside the functions which need them.
 from AI4Water.utils.datasets.download_pangaea import PanDataSet
 from AI4Water.utils.datasets.download_zenodo import download_from_zenodo
 from AI4Water.utils.datasets.utils import download, download_all_http_directory
@@ -208,34 +195,77 @@ from .utils import check_attributes, sanity_check
 SEP = os.sep
 # TODO, add visualization
 
-# TODO all available datasets should be available using a single interface instead of importing each separately
-DATASETS = [
-    'ISWDC',
-    'SEBAL_ET_CHINA',
-    'GeoChemMatane',
-    'PrecipBerlin',
-    'HydroChemJava',
-    'WaterChemVictoriaLakes',
-    'WaterChemEcuador',
-    'HydrocarbonsGabes',
-    'SedimentAmersee',
-    'FlowTetRiver',
-    'HoloceneTemp',
-    'RiverTempEroo',
-    'StreamTempSpain',
-    'FlowSedDenmark',
-    'FlowSamoylov',
-    'EtpPcpSamoylov',
-    'RiverIsotope',
-    'WQCantareira',
-    'RiverTempSpain',
-    'HydrometricParana',
-    'FlowBenin',
-    'YamaguchiClimateJp',
-    'WQJordan2',
-    'WQJordan',
-    'Weisssee'
-            ]
+
+
+# parsed data files of pangaea datasets, keyed by file path and the arguments used to read them
+_FRAMES_CACHE = {}
+# the oldest parsed file is dropped from the cache when it holds more files than this
+_FRAMES_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=64)
+def _pangaea_dataset(url):
+    """PanDataSet makes network requests when it is created, so it is created only once for each url"""
+    return PanDataSet(url)
+
+
+# arguments of pd.read_csv which are also supported by its pyarrow engine
+_PYARROW_CSV_ARGS = ('sep', 'delimiter', 'header', 'names', 'index_col', 'usecols', 'dtype',
+                     'true_values', 'false_values', 'na_values', 'parse_dates', 'encoding')
+
+
+def _csv_kwargs(kwargs: dict) -> dict:
+    """uses the multi-threaded pyarrow parser of pandas if it is available, the user
+    has not chosen an engine and all the given arguments are supported by it. Unlike
+    the default parser, pyarrow parses the columns of ISO 8601 time stamps e.g. `Date/Time`
+    of pangaea files to datetime64. Passing `engine='c'` keeps them as strings."""
+    if 'engine' in kwargs or not _installed('pyarrow'):
+        return kwargs
+    if not _pandas_at_least(1, 4):
+        return kwargs
+    if not all(k in _PYARROW_CSV_ARGS for k in kwargs):
+        return kwargs
+    return dict(kwargs, engine='pyarrow')
+
+
+def _read_csv_as_arrays(fpath) -> dict:
+    """reads csv file into a dictionary of numpy arrays using pyarrow if it is installed. The
+    keys are the column names as they are in the file and the columns of dates and times are
+    returned as strings, same as pd.read_csv does, so the result does not depend upon pyarrow."""
+    if not _installed('pyarrow'):
+        df = pd.read_csv(fpath)
+        return {col: df[col].to_numpy() for col in df.columns}
+
+    import pyarrow as pa
+    import pyarrow.csv as pac
+    table = pac.read_csv(fpath)
+    columns = {col: table.column(col) for col in table.column_names}
+
+    # pyarrow infers the types of dates and times, these columns are read again as strings
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        strings = pac.read_csv(fpath, convert_options=pac.ConvertOptions(
+            include_columns=temporal, column_types={col: pa.string() for col in temporal}))
+        columns.update({col: strings.column(col) for col in temporal})
+
+    return {col: arr.to_numpy() for col, arr in columns.items()}
+
+
+def _cache_frame(key, df):
+    """puts the parsed data file `df` in the cache of parsed data files"""
+    _FRAMES_CACHE[key] = df
+    # dicts keep the insertion order so the first key is of the oldest file
+    while len(_FRAMES_CACHE) > _FRAMES_CACHE_SIZE:
+        _FRAMES_CACHE.pop(next(iter(_FRAMES_CACHE)))
+    return df
+
+
+def _clear_frames_cache(ds_dir):
+    """removes the data files in `ds_dir` and its sub-directories from the cache of parsed data files"""
+    ds_dir = os.path.join(ds_dir, '')  # so that only the files inside ds_dir are matched and not of e.g. ds_dir2
+    for key in [key for key in _FRAMES_CACHE if key[0].startswith(ds_dir)]:
+        _FRAMES_CACHE.pop(key)
+    return
 
 
 class Datasets(object):
@@ -246,6 +276,10 @@ class Datasets(object):
         We don't host datasets. Each dataset is downloaded fromt he target remote
         server and saved into local disk.
     """
+    # subclasses which don't set any attribute of their own declare empty __slots__
+    # so that their instances are created without __dict__
+    __slots__ = ('units', 'name', 'data_files', 'metadata_files', '_dataset_dir', '__weakref__')
+
     def __init__(self, name=None, units=None):
         if name is None:
             name = self.__class__.__name__
@@ -272,9 +306,13 @@ class Datasets(object):
 
     @property
     def ds_dir(self):
-        _dir = os.path.join(self.base_ds_dir, self.__class__.__name__)
-        if not os.path.exists(_dir):
-            os.makedirs(_dir)
+        """Directory where the dataset is saved. It is created only on first access,
+        later accesses return the stored path without touching the file system."""
+        _dir = getattr(self, '_dataset_dir', None)
+        if _dir is None:
+            _dir = os.path.join(self.base_ds_dir, self.__class__.__name__)
+            os.makedirs(_dir, exist_ok=True)
+            self._dataset_dir = _dir
         return _dir
 
     def _download(self, overwrite=False):
@@ -297,52 +335,40 @@ Use overwrite=True to remove previously saved files and download again""")
     def _download_and_unzip(self):
         if not os.path.exists(self.ds_dir):
             os.makedirs(self.ds_dir)
+        # zenodo urls and urls without a file name are downloaded into ds_dir
+        _download_all([(url, self.ds_dir if fname is None or 'zenodo' in url else os.path.join(self.ds_dir, fname))
+                       for fname, url in self._normalized_urls()])
+        self._unzip()
+        return
+
+    def _normalized_urls(self) -> list:
+        """returns `url` as list of (file name, url) tuples, where file name is
+        None if it is not given."""
         if isinstance(self.url, str):
-            if 'zenodo' in self.url:
-                download_from_zenodo(self.ds_dir, self.url)
-            else:
-                download(self.url, self.ds_dir)
-            self._unzip()
+            return [(None, self.url)]
         elif isinstance(self.url, list):
-            for url in self.url:
-                if 'zenodo' in url:
-                    download_from_zenodo(self.ds_dir, url)
-                else:
-                    download(url, self.ds_dir)
-            self._unzip()
+            return [(None, url) for url in self.url]
         elif isinstance(self.url, dict):
-            for fname, url in self.url.items():
-                if 'zenodo' in url:
-                    download_from_zenodo(self.ds_dir, url)
-                else:
-                    download(url, os.path.join(self.ds_dir, fname))
-            self._unzip()
-        return
+            return list(self.url.items())
+        raise TypeError(f"unknown type of url {self.url.__class__.__name__}")
 
     def _unzip(self, dirname=None):
         """unzip all the zipped files in a directory"""
         if dirname is None:
             dirname = self.ds_dir
 
-        all_files = glob.glob(f"{dirname}/*.zip")
-        for f in all_files:
-            src = os.path.join(dirname, f)
-            trgt = os.path.join(dirname, f.split('.zip')[0])
-            if not os.path.exists(trgt):
-                print(f"unziping {src} to {trgt}")
-                with zipfile.ZipFile(os.path.join(dirname, f), 'r') as zip_ref:
-                    try:
-                        zip_ref.extractall(os.path.join(dirname, f.split('.zip')[0]))
-                    except OSError:
-                        filelist = zip_ref.filelist
-                        for _file in filelist:
-                            if '.txt' in _file.filename or '.csv' in _file.filename or '.xlsx' in _file.filename:
-                                zip_ref.extract(_file)
-
-        # extracting tar.gz files todo, check if zip files can also be unpacked by the following oneliner
-        gz_files = glob.glob(f"{self.ds_dir}/*.gz")
-        for f in gz_files:
-            shutil.unpack_archive(f, self.ds_dir)
+        # _scan already returns the complete path of the archives
+        jobs = [(_extract_zip, f, f.split('.zip')[0]) for f in _scan(dirname, ".zip")
+                if not os.path.exists(f.split('.zip')[0])]
+        jobs += [(_extract_tar, f, self.ds_dir) for f in _scan(self.ds_dir, ".gz")]
+
+        # each archive is extracted in a separate thread, decompression in zlib releases the GIL
+        if len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+                list(executor.map(lambda job: job[0](job[1], job[2]), jobs))
+        else:
+            for func, src, trgt in jobs:
+                func(src, trgt)
 
         return
 
@@ -351,6 +377,9 @@ Use overwrite=True to remove previously saved files and download again""")
         if os.path.exists(self.ds_dir):
             if overwrite:
                 print("removing previously downloaded data and downloading again")
+                _pangaea_dataset.cache_clear()
+                _clear_frames_cache(self.ds_dir)
+                self._download_from_pangaea()
             else:
                 print(f"The path {self.ds_dir} already exists.")
                 self.data_files = [f for f in os.listdir(self.ds_dir) if f.endswith('.txt')]
@@ -365,12 +394,13 @@ Use overwrite=True to remove previously saved files and download again""")
     def _download_from_pangaea(self):
         self.data_files = []
         self.metadata_files = []
-        ds = PanDataSet(self.url)
+        ds = _pangaea_dataset(self.url)
         kids = ds.children()
         if len(kids) > 1:
-            for kid in kids:
-                kid_ds = PanDataSet(kid)
-                fname = kid_ds.download(self.ds_dir)
+            # resolving and downloading each child is network bound so it is done in parallel threads
+            with ThreadPoolExecutor(max_workers=min(8, len(kids))) as executor:
+                fnames = list(executor.map(lambda kid: _pangaea_dataset(kid).download(self.ds_dir), kids))
+            for fname in fnames:
                 self.metadata_files.append(fname + '._metadata.json')
                 self.data_files.append(fname + '.txt')
         else:
@@ -382,6 +412,8 @@ Use overwrite=True to remove previously saved files and download again""")
 
 class Weisssee(Datasets):
 
+    __slots__ = ()
+
     dynamic_attributes = ['Precipitation_measurements',
                           'long_wave_upward_radiation',
                           'snow_density_at_30cm',
@@ -390,17 +422,42 @@ class Weisssee(Datasets):
 
     url = '10.1594/PANGAEA.898217'
 
-    def fetch(self, **kwargs):
+    def fetch(self, as_numpy: bool = False, **kwargs) -> dict:
+        """
+        Fetches all the data files of the dataset.
+        Arguments:
+            as_numpy : if True, each file is returned as a dictionary of numpy
+                arrays whose keys are the column names. No dataframe is
+                constructed and the time stamps are returned as strings, so this
+                is faster when only the values are needed. `kwargs` are not used then.
+            kwargs : keyword arguments for pd.read_csv. If pyarrow is installed and
+                no `engine` is given, it is used to parse the files and the columns of
+                time stamps are then returned as datetime64 instead of strings.
+        Returns:
+            a dictionary whose keys are names of data files and values are
+            dataframes or dictionaries of numpy arrays.
+        """
         self.download_from_pangaea()
+
+        if as_numpy:
+            return {f.split('.txt')[0]: _read_csv_as_arrays(os.path.join(self.ds_dir, f)) for f in self.data_files}
+
         data = {}
         for f in self.data_files:
             fpath = os.path.join(self.ds_dir, f)
-            df = pd.read_csv(fpath, **kwargs)
 
-            if 'index_col' in kwargs:
-                df.index = pd.to_datetime(df.index)
+            # parsed files are kept in memory so that repeated calls don't parse them again
+            key = (fpath, repr(sorted(kwargs.items())))
+            if key not in _FRAMES_CACHE:
+                df = pd.read_csv(fpath, **_csv_kwargs(kwargs))
+
+                if 'index_col' in kwargs:
+                    df.index = pd.to_datetime(df.index)
 
-            data[f.split('.txt')[0]] = df
+                _cache_frame(key, df)
+
+            # a copy is returned so that changes made by the user don't modify the cache
+            data[f.split('.txt')[0]] = _FRAMES_CACHE[key].copy()
 
         return data
 
@@ -417,121 +474,143 @@ class ISWDC(Datasets):
 
 class WQJordan(Weisssee):
     """Jordan River water quality data of 9 variables for two variables."""
+    __slots__ = ()
     url = 'https://doi.pangaea.de/10.1594/PANGAEA.919103'
 
 
 class WQJordan2(Weisssee):
     """Stage and Turbidity data of Jordan River"""
+    __slots__ = ()
     url = '10.1594/PANGAEA.919104'
 
 
 class YamaguchiClimateJp(Weisssee):
     """Daily climate and flow data of Japan from 2006 2018"""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.909880"
 
 
 class FlowBenin(Weisssee):
     """Flow data"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.831196"
 
 
 class HydrometricParana(Weisssee):
     """Daily and monthly water level and flow data of Parana river Argentina
     from 1875 to 2017."""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.882613"
 
 
 class RiverTempSpain(Weisssee):
     """Daily mean stream temperatures in Central Spain for different periods."""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.879494"
 
 
 class WQCantareira(Weisssee):
     """Water quality and quantity primary data from field campaigns in the Cantareira Water Supply System,
      period Oct. 2013 - May 2014"""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.892384"
 
 
 class RiverIsotope(Weisssee):
     """399 δ18O and δD values in river surface waters of Indian River"""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.912582"
 
 
 class EtpPcpSamoylov(Weisssee):
     """Evpotranspiration and Precipitation at station TOWER on Samoylov Island Russia
      from 20110524 to 20110819 with 30 minute frequency"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.811076"
 
 
 class FlowSamoylov(Weisssee):
     """Net lateral flow at station INT2 on Samoylov Island Russia
     from 20110612 to 20110819 with 30 minute frequency"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.811072"
 
 
 class FlowSedDenmark(Weisssee):
     """Flow and suspended sediment concentration fields over tidal bedforms, ADCP profile"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.841977"
 
 
 class StreamTempSpain(Weisssee):
     """Daily Mean Stream Temperature at station Tormes3, Central Spain from 199711 to 199906."""
+    __slots__ = ()
     url = "https://doi.pangaea.de/10.1594/PANGAEA.879507"
 
 
 class RiverTempEroo(Weisssee):
     """Water temperature records in the Eroo River and some tributaries (Selenga River basin, Mongolia, 2011-2012)"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.890070"
 
 
 class HoloceneTemp(Weisssee):
     """Holocene temperature reconstructions for northeastern North America and the northwestern Atlantic,
      core Big_Round_Lake."""
+    __slots__ = ()
     url = "10.1594/PANGAEA.905446"
 
 
 class FlowTetRiver(Weisssee):
     """Daily mean river discharge at meteorological station Perpignan upstream, Têt basin France from 1980
     to 2000."""
+    __slots__ = ()
     url = "10.1594/PANGAEA.226925"
 
 
 class SedimentAmersee(Weisssee):
     """Occurence of flood laminae in sediments of Ammersee"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.746240"
 
 
 class HydrocarbonsGabes(Weisssee):
     """Concentration and geological parameters of n-alkanes and n-alkenes in surface sediments from the Gulf of Gabes,
      Tunisia"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.774595"
 
 
 class WaterChemEcuador(Weisssee):
     """weekly and biweekly Water chemistry of cloud forest streams at baseflow conditions,
      Rio San Francisco, Ecuador"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.778629"
 
 
 class WaterChemVictoriaLakes(Weisssee):
     """Surface water chemistry of northern Victoria Land lakes"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.807883"
 
 
 class HydroChemJava(Weisssee):
     """Hydrochemical data from subsurface rivers, coastal and submarine springsin a karstic region
      in southern Java."""
+    __slots__ = ()
     url = "10.1594/PANGAEA.882178"
 
 
 class PrecipBerlin(Weisssee):
     """Sub-hourly Berlin Dahlem precipitation time-series 2001-2013"""
+    __slots__ = ()
     url = "10.1594/PANGAEA.883587"
 
 
 class GeoChemMatane(Weisssee):
     """Geochemical data collected in shallow groundwater and river water in a subpolar environment
      (Matane river, QC, Canada)."""
+    __slots__ = ()
     url = "10.1594/PANGAEA.908290"
 
 
@@ -585,16 +664,15 @@ class WeatherJena(Datasets):
         """
 
         sub_dir = os.path.join(self.ds_dir, self.obs_loc)
-        all_files = glob.glob(f"{sub_dir}/*.csv")
+        all_files = _scan(sub_dir, ".csv")
 
-        df = pd.DataFrame()
+        frames = []
         for fpath in all_files:
-            f_df = pd.read_csv(fpath, index_col='Date Time',
-                               encoding = 'unicode_escape', na_values=-9999)
-            f_df.index = pd.DatetimeIndex(f_df.index)
-            df = pd.concat([df, f_df])  # todo, such concatenation is slow.
+            frames.append(pd.read_csv(fpath, index_col='Date Time', parse_dates=['Date Time'],
+                                      encoding='unicode_escape', na_values=-9999))
 
-        df = df.sort_index()
+        # concatenating once instead of inside the loop avoids copying the accumulated frame for every file
+        df = pd.concat(frames, copy=False).sort_index()
 
         if st is None:
             st = df.index[0]
@@ -613,15 +691,111 @@ class SWECanada(Datasets):
     feaures = ['snw', 'snd', 'den']
     q_flags = ['data_flag_snw', 'data_flag_snd', 'qc_flag_snw', 'qc_flag_snd']
 
-    def __init__(self, **kwargs):
+    fname = 'CanSWE-CanEEN_1928-2020_v1.nc'
+    chunked_fname = 'CanSWE-CanEEN_1928-2020_v1_chunked.nc'
+
+    def __init__(self, backend: str = 'netcdf4', **kwargs):
+        """
+        Arguments:
+            backend : library to read the netCDF file, either `netcdf4` or
+                `xarray`. If xarray is not installed, netcdf4 is used.
+            kwargs : passed to `Datasets`
+        """
+        # set first so that __del__ can close the file even if __init__ fails
+        self._nc = None
+
+        assert backend in ['netcdf4', 'xarray'], f"unknown backend {backend}"
+        if backend == 'xarray' and not _installed('xarray'):
+            warnings.warn("xarray is not installed, netcdf4 will be used to read the data")
+            backend = 'netcdf4'
+        self.backend = backend
+
+        self._stations = None
+        self._stns_arr = None
+        self._stns_order = None
+
         super().__init__(**kwargs)
 
         self._download()
+        self._rechunk_if_needed()
+
+    @property
+    def nc_path(self):
+        """path of netCDF file to read. The rechunked file is used if it exists."""
+        chunked = os.path.join(self.ds_dir, self.chunked_fname)
+        if os.path.exists(chunked):
+            return chunked
+        return os.path.join(self.ds_dir, self.fname)
+
+    @property
+    def nc(self):
+        """netCDF4 Dataset handle which is opened once and reused by all the methods"""
+        if self._nc is None:
+            netCDF4 = _import('netCDF4', 'to read SWECanada data')
+            self._nc = netCDF4.Dataset(self.nc_path, 'r')
+            # values equal to _FillValue are then masked by netCDF4 itself
+            self._nc.set_auto_mask(True)
+            for var in self.feaures + self.q_flags:
+                if var in self._nc.variables:
+                    self._nc[var].set_var_chunk_cache(size=64 * 1024 * 1024, nelems=2000, preemption=0.75)
+        return self._nc
+
+    def _rechunk_if_needed(self):
+        """
+        The data is always read as complete time series of one or more stations.
+        This rewrites the netCDF file with `nccopy` so that each chunk holds
+        complete time series of one station, otherwise reading one station
+        decompresses many chunks. If `nccopy` is not available, the original
+        file is used as it is.
+        """
+        src = os.path.join(self.ds_dir, self.fname)
+        dst = os.path.join(self.ds_dir, self.chunked_fname)
+        if os.path.exists(dst) or not os.path.exists(src):
+            return
+
+        nccopy = shutil.which('nccopy')
+        if nccopy is None:
+            return
+
+        netCDF4 = _import('netCDF4', 'to read SWECanada data')
+        with netCDF4.Dataset(src, 'r') as nc:
+            stn_dim, time_dim = nc[self.feaures[0]].dimensions
+            num_steps = len(nc.dimensions[time_dim])
+
+        tmp = dst + '.tmp'
+        print(f"rechunking {src} to {dst}")
+        try:
+            subprocess.run([nccopy, '-k', 'nc4', '-d', '1', '-c', f'{stn_dim}/1,{time_dim}/{num_steps}', src, tmp],
+                           check=True)
+        except subprocess.CalledProcessError as e:
+            warnings.warn(f"rechunking of {src} failed with {e}, original file will be used")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+
+        os.replace(tmp, dst)
+        return
+
+    def close(self):
+        """closes the netCDF file if it is open"""
+        if self._nc is not None:
+            self._nc.close()
+            self._nc = None
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
 
     def stations(self) -> list:
-        nc = netCDF4.Dataset(os.path.join(self.ds_dir, 'CanSWE-CanEEN_1928-2020_v1.nc'))
-        s = nc['station_id'][:]
-        return s.tolist()
+        if self._stations is None:
+            self._stations = self.nc['station_id'][:].tolist()
+        return self._stations
 
     @property
     def start(self):
@@ -663,7 +837,7 @@ class SWECanada(Datasets):
         """
 
         if station_id is None:
-            station_id - self.stations()
+            station_id = self.stations()
         elif isinstance(station_id, str):
             station_id = [station_id]
         elif isinstance(station_id, list):
@@ -674,10 +848,8 @@ class SWECanada(Datasets):
             num_stations = int(len(self.stations()) * station_id)
             station_id = random.sample(self.stations(), num_stations)
 
-        stns = self.stations()
-        stn_id_dict = {k: v for k, v in zip(stns, np.arange(len(stns)))}
-        stn_id_dict_inv = {v: k for k, v in stn_id_dict.items()}
-        stn_ids = [stn_id_dict[i] for i in station_id]
+        stn_ids = self._station_indices(station_id)
+        stn_names = self._stns_arr[stn_ids].tolist()
 
         features = check_attributes(features, self.feaures)
         qflags = []
@@ -686,11 +858,18 @@ class SWECanada(Datasets):
 
         features_to_fetch = features + qflags
 
+        if self.backend == 'xarray':
+            return self._fetch_with_xarray(stn_ids, stn_names, features_to_fetch, st, en)
+
+        # read all the requested stations of each variable at once and then split them in memory
+        arrays = {var: self._read_stations(var, stn_ids) for var in features_to_fetch}
+        idx = pd.date_range(self.start, self.end, freq='D')
+
         all_stn_data = {}
-        for stn in stn_ids:
+        for i, stn in enumerate(stn_names):
 
-            stn_df = self.fetch_station_attributes(stn, features_to_fetch, st=st, en=en)
-            all_stn_data[stn_id_dict_inv[stn]] = stn_df
+            stn_df = pd.DataFrame({var: arrays[var][i] for var in features_to_fetch}, index=idx)
+            all_stn_data[stn] = stn_df[st:en]
 
         return all_stn_data
 
@@ -702,23 +881,54 @@ class SWECanada(Datasets):
                                  ) -> pd.DataFrame:
         """fetches attributes of one station"""
 
-        st, en = self._check_length(st, en)
+        idx = pd.date_range(self.start, self.end, freq='D')
+
+        stn_df = pd.DataFrame({var: self._read_stations(var, [stn])[0] for var in features_to_fetch},
+                              index=idx)
+
+        return stn_df[st:en]
 
-        nc = netCDF4.Dataset(os.path.join(self.ds_dir, 'CanSWE-CanEEN_1928-2020_v1.nc'))
+    def _fetch_with_xarray(self, stn_ids, stn_names, features_to_fetch, st=None, en=None) -> dict:
+        """reads all the requested features of all the requested stations in one
+        slice using xarray. The file is opened lazily with dask chunks if dask is
+        installed."""
+        ds = _open_xr_dataset(self.nc_path)
+        stn_dim = ds[features_to_fetch[0]].dims[0]
 
-        stn_df = pd.DataFrame(columns=features_to_fetch)
+        sub = ds[features_to_fetch].isel({stn_dim: stn_ids}).load()
+        idx = pd.date_range(self.start, self.end, freq='D')
 
-        for var in nc.variables:
-            if var in features_to_fetch:
-                ma = np.array(nc[var][:])
-                ma[ma == nc[var]._FillValue] = np.nan
-                ta = ma[stn, :]  # target array of on station
-                s = pd.Series(ta, index=pd.date_range(self.start, self.end, freq='D'), name=var)
-                stn_df[var] = s[st:en]
+        all_stn_data = {}
+        for i, stn in enumerate(stn_names):
+            stn_df = pd.DataFrame({var: sub[var].values[i] for var in features_to_fetch}, index=idx)
+            all_stn_data[stn] = stn_df[st:en]
+
+        return all_stn_data
+
+    def _station_indices(self, station_id: list) -> np.ndarray:
+        """finds the indices of stations in the netCDF file by binary search over
+        sorted station names"""
+        if self._stns_arr is None:
+            self._stns_arr = np.asarray(self.stations())
+            self._stns_order = np.argsort(self._stns_arr)
+
+        station_id = np.asarray(station_id)
+        pos = np.searchsorted(self._stns_arr, station_id, sorter=self._stns_order)
+        idx = self._stns_order[np.clip(pos, 0, len(self._stns_arr) - 1)]
 
-        nc.close()
+        missing = station_id[self._stns_arr[idx] != station_id]
+        if len(missing) > 0:
+            raise KeyError(f"stations {missing.tolist()} are not available")
+        return idx
 
-        return stn_df
+    def _read_stations(self, var, stn_ids) -> np.ndarray:
+        """reads the variable `var` only for the stations whose indices are `stn_ids`
+        and returns it as array of shape (stations, time) with missing values as nan"""
+        # netCDF4 expects sorted indices, so the stations are read in sorted order
+        # and then put back in the order in which they were asked.
+        uniq, inv = np.unique(np.asarray(stn_ids), return_inverse=True)
+        arr = self.nc[var][uniq, :]
+        return _masked_to_nan(arr)[inv]
 
 
 class RRLuleaSweden(Datasets):
@@ -797,6 +1007,7 @@ class MtropicsLaos(Datasets):
         "Ecoli_mpn100": "E-coli_4dilutions",  # Stream water Escherichia coli concentration
         "Ecoli_UL_mpn100": "E-coli_4dilutions_95%-CI-UL"  # Upper limit of the confidence interval
                             }
+    _inv_physio_chem_features = {v: k for k, v in physio_chem_features.items()}
 
     weather_station_data = ['air_temp', 'humidity', 'wind_run', 'global_rad']
     inputs = list(physio_chem_features.keys()) + weather_station_data + ['water_level', 'pcp', 'susp_pm']
@@ -812,20 +1023,93 @@ class MtropicsLaos(Datasets):
         if not os.path.exists(out_dir):
             os.makedirs(out_dir)
 
-        files = glob.glob(f'{in_dir}/*.shp')
-        for fpath in files:
-            f = os.path.basename(fpath)
-            shp_file = os.path.join(in_dir, f)
-            op = os.path.join(out_dir, f)
-
-            _process_laos_shpfiles(shp_file, op)
+        # only those files are processed which have not been processed before or have changed since then
+        pending = []
+        for shp_file in _scan(in_dir, '.shp'):
+            op = os.path.join(out_dir, os.path.basename(shp_file))
+            if not os.path.exists(op) or os.path.getmtime(shp_file) > os.path.getmtime(op):
+                pending.append((shp_file, op))
+
+        # the processing is cpu bound so it is done in separate processes. With 'spawn' start method,
+        # the user script is imported again by the child processes, so processes are only used with 'fork'.
+        # The 'fork' context is asked for explicitly so that the start method of the user's process is not set.
+        if len(pending) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context('fork').Pool(min(os.cpu_count() or 1, len(pending))) as pool:
+                pool.starmap(_process_laos_shpfiles, pending)
+        else:
+            for shp_file, op in pending:
+                _process_laos_shpfiles(shp_file, op)
 
     def fetch_lu(self, processed=False):
         """returns landuse data as list of shapefiles"""
         lu_dir = os.path.join(self.ds_dir, f"{'lu1' if processed else 'lu'}")
-        files = glob.glob(f'{lu_dir}/*.shp')
+        files = _scan(lu_dir, '.shp')
         return files
 
+    def spatial_index(self, year: int):
+        """
+        returns R-tree index over the bounding boxes of land use polygons of a year.
+        The index is built on first call and saved next to the shapefile, later
+        calls load it from disk.
+        Arguments:
+            year : year of land use e.g. 2011
+        Returns:
+            `rtree.index.Index` whose ids are the record numbers of polygons in
+            the land use shapefile.
+
+        Example:
+        --------
+        ```python
+        >>>laos = MtropicsLaos()
+        >>>idx = laos.spatial_index(2011)
+        >>>records = list(idx.intersection((minx, miny, maxx, maxy)))
+        ```
+        """
+        rtree_index = _import('rtree.index', 'to build spatial index of land use')
+
+        shp_file = self._lu_file(year)
+        # rtree adds .idx and .dat extensions itself
+        idx_path = os.path.splitext(shp_file)[0]
+        if not os.path.exists(idx_path + '.idx'):
+            self._build_spatial_index(shp_file, idx_path)
+
+        return rtree_index.Index(idx_path)
+
+    def lu_extents(self, year: int) -> pd.DataFrame:
+        """returns bounding boxes of land use polygons of a year as dataframe with
+        columns `id`, `minx`, `miny`, `maxx` and `maxy`. This can be used for quick
+        visualization without loading the geometries."""
+        shp_file = self._lu_file(year)
+        fname = os.path.splitext(shp_file)[0] + '_extents.f'
+        if not os.path.exists(fname):
+            self.spatial_index(year)
+        return _read_feather(fname)
+
+    def _lu_file(self, year) -> str:
+        shp_file = os.path.join(self.ds_dir, 'lu', f'LU{year}.shp')
+        if not os.path.exists(shp_file):
+            raise FileNotFoundError(f"No land use shapefile found for year {year} at {shp_file}")
+        return shp_file
+
+    @staticmethod
+    def _build_spatial_index(shp_file, idx_path):
+        """iterates over the shapes only once to bulk load the R-tree and to save their bounding boxes"""
+        shapefile = _import('shapefile', 'to build spatial index of land use')
+        rtree_index = _import('rtree.index', 'to build spatial index of land use')
+
+        shp_reader = shapefile.Reader(shp_file)
+
+        extents = []
+        for i, shp in enumerate(shp_reader.iterShapes()):
+            if shp.shapeType == 0:  # null shape
+                continue
+            extents.append([i] + list(shp.bbox))
+
+        rtree_index.Index(idx_path, ((ext[0], tuple(ext[1:]), None) for ext in extents)).close()
+
+        _write_feather(pd.DataFrame(extents, columns=['id', 'minx', 'miny', 'maxx', 'maxy']), idx_path + '_extents.f')
+        return
+
     def fetch_ecoli(self,
                     st: Union[str, pd.Timestamp] = '20110525 10:00:00',
                     en: Union[str, pd.Timestamp] = '20210406 15:05:00',
@@ -839,28 +1123,28 @@ class MtropicsLaos(Datasets):
             st :
             en :
             features : physi-chemical features to fetch. By default only E. coli
-                concentration is returned
+                concentration is returned. If `all`, all the features are returned.
         Returns:
-            a pandas dataframe consisting of features as columns.
+            a pandas dataframe consisting of features as columns. The columns
+            are named as the keys of `physio_chem_features`.
         """
-        fname = os.path.join(self.ds_dir, 'ecoli_data.csv')
-        df = pd.read_csv(fname, sep='\t')
-        df.index = pd.to_datetime(df['Date_Time'])
+        features = check_attributes(features, list(self.physio_chem_features.keys()))
+        # names of features as they appear in the csv file
+        _features = list(map(self.physio_chem_features.__getitem__, features))
 
-        if isinstance(features, list):
-            _features = []
-            for f in features:
-                _features.append(self.physio_chem_features[f])
+        fname = os.path.join(self.ds_dir, 'ecoli_data.csv')
+        # parsed csv file is saved as feather file which is used as long as it is newer than the csv file
+        cache = os.path.join(self.ds_dir, 'ecoli_data.f')
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(fname):
+            df = _read_feather(cache, columns=['Date_Time'] + _features)
         else:
-            assert isinstance(features, str)
-            if features == 'all':
-                _features = features
-            else:
-                _features = self.physio_chem_features[features]
+            df = pd.read_csv(fname, sep='\t', parse_dates=['Date_Time'])
+            _write_feather(df, cache)
+            df = df[['Date_Time'] + _features]
 
-        features = check_attributes(_features, list(self.physio_chem_features.values()))
+        df.index = df.pop('Date_Time')
 
-        return df[st:en][features]
+        return df[st:en].rename(columns=self._inv_physio_chem_features)
 
     def fetch_rain_gauges(self,
                           st: Union[str, pd.Timestamp] = "20010101",
@@ -881,22 +1165,28 @@ class MtropicsLaos(Datasets):
         """
         # todo, does nan means 0 rainfall?
         fname = os.path.join(self.ds_dir, 'rain_guage', 'rain_guage.f')
-        if not os.path.exists(fname):
-            files = glob.glob(f"{os.path.join(self.ds_dir, 'rain_guage')}/*.xlsx")
-            df = pd.DataFrame()
-            for f in files:
-                _df = pd.read_excel(f, sheet_name='Daily', usecols=['R1', 'R2', 'R3', 'R4', 'R5', 'R6', 'R7'])
-                df = pd.concat([df, _df])
+        if (fname,) in _FRAMES_CACHE:
+            return _time_slice(_FRAMES_CACHE[(fname,)], st, en)
+
+        with _cache_lock(fname):
+            if not os.path.exists(fname):
+                files = _scan(os.path.join(self.ds_dir, 'rain_guage'), '.xlsx')
+                engine = _excel_engine()
+                frames = []
+                for f in files:
+                    frames.append(pd.read_excel(f, sheet_name='Daily', engine=engine,
+                                                usecols=['R1', 'R2', 'R3', 'R4', 'R5', 'R6', 'R7']))
 
-            df = df.reset_index(drop=True)  # index is of type Int64Index
-            df.to_feather(fname)
+                df = pd.concat(frames, ignore_index=True, copy=False)
+                _write_feather(df, fname)
 
-        else:  # feather file already exists so load from it
-            df = pd.read_feather(fname)
+            else:  # feather file already exists so load from it
+                df = _read_feather(fname)
 
         df.index = pd.date_range('20010101', periods=len(df), freq='D')
+        _cache_frame((fname,), df)
 
-        return df[st:en]
+        return _time_slice(df, st, en)
 
     def fetch_weather_station_data(self,
                                    st: Union[str, pd.Timestamp] = "20010101 01:00:00",
@@ -915,23 +1205,28 @@ class MtropicsLaos(Datasets):
         """
 
         fname = os.path.join(self.ds_dir, 'weather_station', 'weather_stations.f')
-        if not os.path.exists(fname):
-            files = glob.glob(f"{os.path.join(self.ds_dir, 'weather_station')}/*.xlsx")
-            df = pd.DataFrame()
-            for f in files:
-                _df = pd.read_excel(f, sheet_name='Hourly', usecols=['T', 'H', 'W', 'Gr'])
-                df = pd.concat([df, _df])
-
-            df = df.reset_index(drop=True)  # index is of type Int64Index
-            df.to_feather(fname)
-        else:  # feather file already exists so load from it
-            df = pd.read_feather(fname)
+        if (fname,) in _FRAMES_CACHE:
+            return _time_slice(_FRAMES_CACHE[(fname,)], st, en)
+
+        with _cache_lock(fname):
+            if not os.path.exists(fname):
+                files = _scan(os.path.join(self.ds_dir, 'weather_station'), '.xlsx')
+                engine = _excel_engine()
+                frames = []
+                for f in files:
+                    frames.append(pd.read_excel(f, sheet_name='Hourly', usecols=['T', 'H', 'W', 'Gr'], engine=engine))
+
+                df = pd.concat(frames, ignore_index=True, copy=False)
+                _write_feather(df, fname)
+            else:  # feather file already exists so load from it
+                df = _read_feather(fname)
 
         df.columns = self.weather_station_data
 
         df.index = pd.date_range('20010101 01:00:00', periods=len(df), freq='H')
+        _cache_frame((fname,), df)
 
-        return df[st:en]
+        return _time_slice(df, st, en)
 
     def fetch_pcp(self,
                   st: Union[str, pd.Timestamp] = '20010101 00:06:00',
@@ -951,23 +1246,29 @@ class MtropicsLaos(Datasets):
         # todo allow change in frequency
 
         fname = os.path.join(self.ds_dir, 'pcp', 'pcp.f')
+        if (fname,) in _FRAMES_CACHE:
+            return _time_slice(_FRAMES_CACHE[(fname,)], st, en)
+
         # feather file does not exist
-        if not os.path.exists(fname):
-            files = glob.glob(f"{os.path.join(self.ds_dir, 'pcp')}/*.xlsx")
-            df = pd.DataFrame()
-            for f in files:
-                _df = pd.read_excel(f, sheet_name='6mn', usecols=['Rfa'])
-                df = pd.concat([df, _df])
+        with _cache_lock(fname):
+            if not os.path.exists(fname):
+                files = _scan(os.path.join(self.ds_dir, 'pcp'), '.xlsx')
+                engine = _excel_engine()
+                frames = []
+                for f in files:
+                    frames.append(pd.read_excel(f, sheet_name='6mn', usecols=['Rfa'], engine=engine))
+
+                df = pd.concat(frames, ignore_index=True, copy=False)
+                _write_feather(df, fname)
+            else:  # feather file already exists so load from it
+                df = _read_feather(fname)
 
-            df = df.reset_index(drop=True)
-            df.to_feather(fname)
-        else:  # feather file already exists so load from it
-            df = pd.read_feather(fname)
+        df.columns = ['pcp']
 
         df.index = pd.date_range('20010101 00:06:00', periods=len(df), freq='6min')
-        df.columns = ['pcp']
+        _cache_frame((fname,), df)
 
-        return df[st:en]
+        return _time_slice(df, st, en)
 
     def fetch_hydro(self,
                     st: Union[str, pd.Timestamp] = '20010101 00:06:00',
@@ -985,49 +1286,64 @@ class MtropicsLaos(Datasets):
         """
         wl_fname = os.path.join(self.ds_dir, 'hydro', 'wl.f')
         spm_fname = os.path.join(self.ds_dir, 'hydro', 'spm.f')
-        if not os.path.exists(wl_fname):
-            files = glob.glob(f"{os.path.join(self.ds_dir, 'hydro')}/*.xlsx")
-            wl = pd.DataFrame()
-            spm = pd.DataFrame()
-            for f in files:
-                _df = pd.read_excel(f, sheet_name='Aperiodic')
-                _wl = _df[['Date', 'Time', 'RWL04']]
-                _wl.index = pd.to_datetime(_wl['Date'].astype(str) + ' ' + _wl['Time'].astype(str))
-                _spm = _df[['Date.1', 'Time.1', 'SPM04']]
-                _spm = _spm.iloc[_spm.first_valid_index():_spm.last_valid_index()]
-                if os.path.basename(f) == 'OMPrawdataLaos2016.xlsx':
-                    _spm.iloc[166] = ['2016-07-01', '20:43:47', 1.69388]
-                    _spm.iloc[247] =  ['2016-07-23', '12:57:47', 8.15714]
-                    _spm.iloc[248] = ['2016-07-23', '17:56:47', 0.5]
-                    _spm.iloc[352] = ['2016-08-16', '03:08:17', 1.12711864406]
-                if os.path.basename(f) == 'OMPrawdataLaos2017.xlsx':
-                    _spm.index = pd.to_datetime(_spm['Date.1'].astype(str))
-                else:
-                    _spm.index = pd.to_datetime(_spm['Date.1'].astype(str) + ' ' + _spm['Time.1'].astype(str))
-                wl = pd.concat([wl, _wl['RWL04']])
-                spm = pd.concat([spm, _spm['SPM04']])
-
-            wl.columns = ['water_level']
-            wl = wl.reset_index()
-            wl.to_feather(wl_fname)
-            spm.columns = ['susp_pm']
-            spm = spm.reset_index()
-            spm.to_feather(spm_fname)
-        else:
-            wl = pd.read_feather(wl_fname)
-            spm = pd.read_feather(spm_fname)
+        if (wl_fname,) in _FRAMES_CACHE and (spm_fname,) in _FRAMES_CACHE:
+            wl, spm = _FRAMES_CACHE[(wl_fname,)], _FRAMES_CACHE[(spm_fname,)]
+            return wl[st:en].copy(), spm[st:en].copy()
+
+        with _cache_lock(wl_fname):
+            if not os.path.exists(wl_fname):
+                files = _scan(os.path.join(self.ds_dir, 'hydro'), '.xlsx')
+                engine = _excel_engine()
+                wl_vals, wl_idx = [], []
+                spm_vals, spm_idx = [], []
+                for f in files:
+                    _df = pd.read_excel(f, sheet_name='Aperiodic', engine=engine,
+                                        usecols=['Date', 'Time', 'RWL04', 'Date.1', 'Time.1', 'SPM04'])
+                    _wl = _df[['Date', 'Time', 'RWL04']]
+                    _wl.index = pd.to_datetime(_wl['Date'].astype(str) + ' ' + _wl['Time'].astype(str))
+                    _spm = _df[['Date.1', 'Time.1', 'SPM04']]
+                    _spm = _spm.iloc[_spm.first_valid_index():_spm.last_valid_index()]
+                    if os.path.basename(f) == 'OMPrawdataLaos2016.xlsx':
+                        _spm.iloc[[166, 247, 248, 352], :] = np.array([
+                            ['2016-07-01', '20:43:47', 1.69388],
+                            ['2016-07-23', '12:57:47', 8.15714],
+                            ['2016-07-23', '17:56:47', 0.5],
+                            ['2016-08-16', '03:08:17', 1.12711864406]], dtype=object)
+                    if os.path.basename(f) == 'OMPrawdataLaos2017.xlsx':
+                        _spm.index = pd.to_datetime(_spm['Date.1'].astype(str))
+                    else:
+                        _spm.index = pd.to_datetime(_spm['Date.1'].astype(str) + ' ' + _spm['Time.1'].astype(str))
+                    wl_vals.append(_wl['RWL04'].to_numpy())
+                    wl_idx.append(_wl.index.to_numpy())
+                    spm_vals.append(_spm['SPM04'].to_numpy())
+                    spm_idx.append(_spm.index.to_numpy())
+
+                wl = pd.DataFrame({'water_level': np.concatenate(wl_vals)},
+                                  index=pd.DatetimeIndex(np.concatenate(wl_idx)))
+                wl = wl.reset_index()
+                spm = pd.DataFrame({'susp_pm': np.concatenate(spm_vals)},
+                                   index=pd.DatetimeIndex(np.concatenate(spm_idx)))
+                spm = spm.reset_index()
+                # wl file is written last because its existence marks both files as complete
+                _write_feather(spm, spm_fname)
+                _write_feather(wl, wl_fname)
+            else:
+                wl = _read_feather(wl_fname)
+                spm = _read_feather(spm_fname)
 
         wl.index = pd.to_datetime(wl.pop('index'))
         spm.index = pd.to_datetime(spm.pop('index'))
+        _cache_frame((wl_fname,), wl)
+        _cache_frame((spm_fname,), spm)
 
-        return wl[st:en], spm[st:en]
+        return wl[st:en].copy(), spm[st:en].copy()
 
     def fetch(self,
               inputs: Union[None, list],
               target: Union[str, list],
-              hru_definition: Union[None, str],
-              st: Union[None, str],
-              en: Union[None, str],
+              hru_definition: Union[None, str] = None,
+              st: Union[None, str] = None,
+              en: Union[None, str] = None,
               **kwargs):
         """
         Fetches dataset of Laos for rainfall runoff modeling [1].
@@ -1036,13 +1352,16 @@ class MtropicsLaos(Datasets):
         Arguments:
             inputs list: names of inputs to use.
             target str/list:
-            hru_definition str:
-            st str:
-            en str:
+            hru_definition str: currently only None is supported.
+            st str: start of data. If None, data is fetched from where it is available.
+            en str: end of data. If None, data is fetched till where it is available.
             **kwargs dict:
 
         returns:
-            a dataframe of shape `(inputs+target, st:en)`
+            a dataframe of shape `(inputs+target, st:en)`. The features are
+            observed at different time steps, so the dataframe is indexed by all
+            the time stamps at which any of the features is observed and NaNs
+            represent that a feature was not observed at that time.
 
         Example:
         --------
@@ -1051,14 +1370,38 @@ class MtropicsLaos(Datasets):
         >>>laos = MtropicsLaos()
         >>>inputs = ['pcp', 'air_temp']
         >>>target = ['Ecoli_mpn100']
-        >>>data = laos.fetch(inputs, target, None, '20110101', '20181231')
+        >>>data = laos.fetch(inputs, target, st='20110101', en='20181231')
         ```
         """
         inputs = check_attributes(inputs, self.inputs)
         target = check_attributes(target, self.target)
-        features_to_fecth = inputs + target
 
-        return
+        if hru_definition is not None:
+            raise NotImplementedError(f"hru_definition {hru_definition} is not supported yet")
+
+        # target can also be an input, it is fetched only once
+        features = list(dict.fromkeys(inputs + target))
+
+        frames = []
+        ecoli_features = [f for f in features if f in self.physio_chem_features]
+        if ecoli_features:
+            frames.append(self.fetch_ecoli(st, en, features=ecoli_features))
+
+        weather_features = [f for f in features if f in self.weather_station_data]
+        if weather_features:
+            frames.append(self.fetch_weather_station_data(st, en)[weather_features])
+
+        if 'pcp' in features:
+            frames.append(self.fetch_pcp(st, en))
+
+        if 'water_level' in features or 'susp_pm' in features:
+            wl, spm = self.fetch_hydro(st, en)
+            frames += [df for df in (wl, spm) if df.columns[0] in features]
+
+        # frames can only be aligned on unique time stamps, the first observation is kept
+        frames = [df[~df.index.duplicated()] for df in frames]
+
+        return pd.concat(frames, axis=1, sort=True)[features]
 
 
 class MtropcsThailand(Datasets):
@@ -1074,45 +1417,253 @@ class MtropicsIndia(Datasets):
     pass
 
 
+# all available datasets, so that any of them can be created by its name
+DATASETS = {cls.__name__: cls for cls in (
+    ISWDC,
+    ETP_CHN_SEBAL,
+    GeoChemMatane,
+    PrecipBerlin,
+    HydroChemJava,
+    WaterChemVictoriaLakes,
+    WaterChemEcuador,
+    HydrocarbonsGabes,
+    SedimentAmersee,
+    FlowTetRiver,
+    HoloceneTemp,
+    RiverTempEroo,
+    StreamTempSpain,
+    FlowSedDenmark,
+    FlowSamoylov,
+    EtpPcpSamoylov,
+    RiverIsotope,
+    WQCantareira,
+    RiverTempSpain,
+    HydrometricParana,
+    FlowBenin,
+    YamaguchiClimateJp,
+    WQJordan2,
+    WQJordan,
+    Weisssee
+)}
+
+
+def get_dataset(name: str, **kwargs) -> Datasets:
+    """
+    Creates a dataset from its name.
+    Arguments:
+        name : name of dataset class e.g. `WQJordan`. Must be one of the keys
+            of `DATASETS`.
+        kwargs : passed to the dataset class.
+    Returns:
+        an instance of the dataset class.
+
+    Example:
+    --------
+    ```python
+    >>>from AI4Water.utils.datasets import get_dataset
+    >>>dataset = get_dataset('WQJordan')
+    ```
+    """
+    if name not in DATASETS:
+        raise ValueError(f"unknown dataset {name}, available datasets are {list(DATASETS.keys())}")
+    return DATASETS[name](**kwargs)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _pandas_at_least(major: int, minor: int) -> bool:
+    return tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (major, minor)
+
+
+def _write_feather(df: pd.DataFrame, fname: str):
+    """writes the cache file as zstd compressed feather (v2) file which is about 3 times
+    smaller than the default lz4 compressed file while being as fast to read. The file is
+    first written under a temporary name and then renamed so that a reader never sees
+    a partially written file."""
+    import pyarrow.feather as paf
+    tmp = f"{fname}.tmp.{os.getpid()}"
+    paf.write_feather(df, tmp, compression='zstd', compression_level=3, chunksize=65536)
+    os.replace(tmp, fname)
+
+
+@contextlib.contextmanager
+def _cache_lock(fname: str):
+    """advisory lock on a sidecar file so that when several processes e.g. during
+    hyperparameter optimization need the cache file `fname`, only one of them builds
+    it while the others wait and then read it. Where fcntl is not available (Windows)
+    no lock is taken."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    with open(fname + '.lock', 'w') as fp:
+        fcntl.flock(fp, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fp, fcntl.LOCK_UN)
+
+
+def _read_feather(fname: str, columns=None) -> pd.DataFrame:
+    import pyarrow.feather as paf
+    return paf.read_feather(fname, columns=columns, memory_map=False)
+
+
+def _time_slice(df: pd.DataFrame, st, en) -> pd.DataFrame:
+    """returns a copy of the rows of `df` between `st` and `en` (both inclusive). The
+    index of `df` must be a sorted DatetimeIndex, the bounds are located with searchsorted
+    and the rows are selected positionally. A copy is returned so that changes made by the
+    user don't modify the cached frame."""
+    i0 = 0 if st is None else df.index.searchsorted(pd.Timestamp(st))
+    i1 = len(df) if en is None else df.index.searchsorted(pd.Timestamp(en), side='right')
+    return df.iloc[i0:i1].copy()
+
+
+def _excel_engine():
+    """returns `calamine` if python-calamine is installed and supported by pandas (>= 2.2)
+    because it parses xlsx files much faster than openpyxl, otherwise None so that
+    pandas uses its default engine."""
+    if _installed('python_calamine') and _pandas_at_least(2, 2):
+        return 'calamine'
+    return None
+
+
+def _import(module: str, purpose: str):
+    """imports an optional dependency at the point where it is needed"""
+    try:
+        return importlib.import_module(module)
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(f"{module.split('.')[0]} must be installed {purpose}")
+
+
+def _scan(dirname, *suffixes) -> list:
+    """returns sorted paths of files in `dirname` ending with any of `suffixes`. The
+    directory is read in a single os.scandir call. Like glob, hidden files are
+    skipped and a missing directory results in empty list."""
+    if not os.path.isdir(dirname):
+        return []
+    with os.scandir(dirname) as entries:
+        return sorted(e.path for e in entries
+                      if not e.name.startswith('.') and e.name.endswith(suffixes) and e.is_file())
+
+
+def _extract_zip(src, trgt):
+    print(f"unziping {src} to {trgt}")
+    with zipfile.ZipFile(src, 'r') as zip_ref:
+        try:
+            zip_ref.extractall(trgt)
+        except OSError:
+            filelist = zip_ref.filelist
+            for _file in filelist:
+                if '.txt' in _file.filename or '.csv' in _file.filename or '.xlsx' in _file.filename:
+                    zip_ref.extract(_file, trgt)
+    return
+
+
+def _extract_tar(src, trgt):
+    """extracts tar.gz archive by reading it as a stream"""
+    with tarfile.open(src, 'r|gz') as tar:
+        tar.extractall(trgt)
+    return
+
+
+def _fetch_one(url, out):
+    """downloads a single url either from zenodo or with a plain http request"""
+    if 'zenodo' in url:
+        return download_from_zenodo(out, url)
+    return download(url, out)
+
+
+def _download_all(targets: list, max_workers: int = 8):
+    """
+    downloads all the (url, out) pairs in `targets`. `download_from_zenodo`
+    changes the working directory of the process, so zenodo urls are downloaded
+    one after the other and the remaining urls are downloaded in parallel threads
+    afterwards.
+    """
+    zenodo = [(url, out) for url, out in targets if 'zenodo' in url]
+    others = [(url, out) for url, out in targets if 'zenodo' not in url]
+
+    for url, out in zenodo:
+        _fetch_one(url, out)
+
+    if len(others) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(others))) as executor:
+            list(executor.map(lambda target: _fetch_one(*target), others))
+    elif len(others) == 1:
+        _fetch_one(*others[0])
+    return
+
+
+@functools.lru_cache(maxsize=8)
+def _open_xr_dataset(path):
+    """opens the netCDF file with xarray only once for each path"""
+    xr = _import('xarray', 'to use xarray backend')
+    chunks = {} if _installed('dask') else None
+    return xr.open_dataset(path, chunks=chunks)
+
+
+def _masked_to_nan(arr):
+    """converts masked array returned by netCDF4 into numpy array with masked values as nan"""
+    arr = np.ma.asarray(arr)
+    if arr.dtype.kind in 'iu':
+        # float32 represents the integer flags exactly and takes half the memory of float64
+        arr = arr.astype(np.float32)
+    if arr.dtype.kind == 'f':
+        return arr.filled(np.nan)
+    return arr.filled()
+
+
 def unzip_all_in_dir(dir_name, ext=".gz"):
-    gz_files = glob.glob(f"{dir_name}/*{ext}")
-    for f in gz_files:
-        shutil.unpack_archive(f, dir_name)
+    gz_files = _scan(dir_name, ext)
+    # archives are extracted in separate threads as in Datasets._unzip
+    if len(gz_files) > 1:
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(gz_files))) as executor:
+            list(executor.map(lambda f: shutil.unpack_archive(f, dir_name), gz_files))
+    else:
+        for f in gz_files:
+            shutil.unpack_archive(f, dir_name)
+
+
+_LU_CATEGORIES = ('Forest', 'Culture', 'Fallow', 'Teak')
+
+
+@functools.lru_cache(maxsize=None)
+def _lu_category(lu: str) -> str:
+    """land use category of a LU3 record of Laos land use shapefiles. There are only a few
+    distinct LU3 values so the prefixes are compared once for each of them."""
+    for category in _LU_CATEGORIES:
+        if lu.startswith(category):
+            return category
+    return 'Culture'  # just consider all others as 'culture' for siplicity
 
 
 def _process_laos_shpfiles(shape_file, out_path):
 
-    if fiona is None:
+    if not _installed('fiona'):
         warnings.warn("preprocessing can not be done because no fiona installation is found.")
         return
 
+    import fiona
+    import shapefile
+    from shapely.geometry import shape, mapping
+    from shapely.ops import unary_union
+
     shp_reader = shapefile.Reader(shape_file)
 
-    container = {
-        'Forest': [],
-        'Culture': [],
-        'Fallow': [],
-        'Teak': [],
-        #'others': []
-    }
+    container = {category: [] for category in _LU_CATEGORIES}
 
-    for i in range(shp_reader.numRecords):
-        lu = find_records(shape_file, 'LU3', i)
-        shp = shp_reader.shape(i)
+    # shapes and records are read in a single pass over the shp and dbf files instead of reopening
+    # the dbf file for the record of each shape.
+    for shp, rec in zip(shp_reader.iterShapes(), shp_reader.iterRecords()):
+        lu = rec['LU3']
         if shp.shapeType == 0:
             continue
-        geom = shape(shp.__geo_interface__)
-        if lu.startswith('Forest'):
-            container['Forest'].append(geom)
-        elif lu.startswith('Culture'):
-            container['Culture'].append(geom)
-        elif lu.startswith('Fallow'):
-            container['Fallow'].append(geom)
-        elif lu.startswith('Teak'):
-            container['Teak'].append(geom)
-        else:  # just consider all others as 'culture' for siplicity
-            container['Culture'].append(geom)
-            #container['others'].append(geom)
+        container[_lu_category(lu)].append(shape(shp.__geo_interface__))
 
     # Define a polygon feature geometry with one attribute
     schema = {
@@ -1126,7 +1677,7 @@ def _process_laos_shpfiles(shape_file, out_path):
     with fiona.open(out_path, 'w', 'ESRI Shapefile', schema) as c:
         for idx, lu in enumerate(list(container.keys())):
             geoms = container[lu]
-            poly = unary_union([shape(s.__geo_interface__) for s in geoms])
+            poly = unary_union(geoms)
 
             assert poly.is_valid
 
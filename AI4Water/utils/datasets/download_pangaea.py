@@ -212,7 +212,9 @@ class PanDataSet:
         self.get_data().to_csv(path, **kwargs)
 
         if 'hierarchyLevel' in self.metadata and self.metadata['hierarchyLevel'] is not None:
-            self.metadata['hierarchyLevel'] = self.metadata['hierarchyLevel'].text
+            # after the first download, it is already converted to text
+            self.metadata['hierarchyLevel'] = getattr(self.metadata['hierarchyLevel'], 'text',
+                                                      self.metadata['hierarchyLevel'])
         fname = os.path.join(os.path.dirname(path), f'{name}_metadata.json')
         with open(fname, 'w') as fp:
             json.dump(self.metadata, fp, indent=4, sort_keys=False)
@@ -1,21 +1,21 @@
 from typing import Union
+import functools
+import importlib
+import inspect
 import warnings
 
+from joblib import Parallel, delayed
+
 from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler, MaxAbsScaler, PowerTransformer,\
     QuantileTransformer, FunctionTransformer
-from sklearn.decomposition import PCA, KernelPCA, IncrementalPCA, FastICA, SparsePCA
-try:
-    from PyEMD import EMD, EEMD
-except ModuleNotFoundError:
-    EMD, EEMD = None, None
-
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 from AI4Water.utils.utils import dateandtime_now
 
+# joblib >= 1.3 can return the results of Parallel as a generator instead of a list
+_PARALLEL_KWS = {'return_as': 'generator'} if 'return_as' in inspect.signature(Parallel).parameters else {}
+
 # TODO add logistic, tanh and more scalers.
 # rpca
 # tSNE
@@ -28,9 +28,25 @@ from AI4Water.utils.utils import dateandtime_now
 
 
 class EmdTransformer(object):
-    """Empirical Mode Decomposition"""
-    def __init__(self, ensemble=False, **kwargs):
+    """Empirical Mode Decomposition
+
+    Arguments:
+        ensemble : whether to use ensemble empirical mode decomposition or not.
+        n_jobs : number of processes in which the columns are decomposed in parallel.
+        max_imf : maximum number of IMFs to extract from each column. By default,
+            all the IMFs are extracted.
+        kwargs : any keyword arguments for EMD/EEMD class of PyEMD e.g. `DTYPE=np.float32`
+            to sift in single precision or `parallel=True` to evaluate the ensemble of
+            EEMD in parallel. When the columns are decomposed in parallel with `n_jobs`,
+            `parallel` of EEMD should not be set to True as well.
+    """
+    def __init__(self, ensemble=False, n_jobs=1, max_imf=-1, **kwargs):
         self.ensemble = ensemble
+        self.n_jobs = n_jobs
+        self.max_imf = max_imf
+        # PyEMD sifts in float64 unless DTYPE is given
+        self.dtype = kwargs.get('DTYPE', np.float64)
+        from PyEMD import EMD, EEMD
         if ensemble:
             self.emd_obj = EEMD(**kwargs)
         else:
@@ -45,22 +61,51 @@ class EmdTransformer(object):
 
         assert len(data.shape) == 2
 
-        imfs = []
-        for col in range(data.shape[1]):
-
-            if self.ensemble:
-                IMFs = self.emd_obj.eemd(data[:, col], **kwargs)
-            else:
-                IMFs = self.emd_obj.emd(data[:, col], **kwargs)
+        # columns are made contiguous so that the sifting does not work on strided memory
+        data = np.asfortranarray(data, dtype=self.dtype)
 
-            imfs.append(IMFs.T)
+        # each column is decomposed independently of others
+        columns = (data[:, col] for col in range(data.shape[1]))
+        if self.n_jobs == 1:
+            imfs = (_sift(self.emd_obj, self.ensemble, column, self.max_imf, **kwargs) for column in columns)
+        else:
+            imfs = Parallel(n_jobs=self.n_jobs, backend='loky', **_PARALLEL_KWS)(
+                delayed(_sift)(self.emd_obj, self.ensemble, column, self.max_imf, **kwargs) for column in columns)
 
-        return np.concatenate(imfs, axis=1)
+        return _stack_imfs(imfs, data.shape)
 
     def inverse_transform(self, **kwargs):
         raise NotImplementedError
 
 
+def _sift(emd_obj, ensemble:bool, column:np.ndarray, max_imf:int, **kwargs)->np.ndarray:
+    """decomposes one column into IMFs which are returned as columns. It is defined at
+    module level so that each process of joblib gets its own copy of `emd_obj`."""
+    if ensemble:
+        IMFs = emd_obj.eemd(column, max_imf=max_imf, **kwargs)
+    else:
+        IMFs = emd_obj.emd(column, max_imf=max_imf, **kwargs)
+    return IMFs.T
+
+
+def _stack_imfs(imfs, shape:tuple)->np.ndarray:
+    """writes the IMFs of each column into one output array as soon as they are extracted.
+    The output is sized from the IMFs of first column and is grown only if a later column
+    has more IMFs than that."""
+    n_rows, n_cols = shape
+    out, start = None, 0
+    for col, col_imfs in enumerate(imfs):
+        k = col_imfs.shape[1]
+        if out is None:
+            out = np.empty((n_rows, k * n_cols), dtype=col_imfs.dtype)
+        elif start + k > out.shape[1]:
+            # make room for this and the remaining columns assuming they have k IMFs each
+            out = np.concatenate([out[:, :start], np.empty((n_rows, k * (n_cols - col)), dtype=out.dtype)], axis=1)
+        out[:, start:start + k] = col_imfs
+        start += k
+    return out[:, :start]
+
+
 class scaler_container(object):
 
     def __init__(self):
@@ -139,19 +184,35 @@ class Transformations(scaler_container):
         "maxabs": MaxAbsScaler,
         "power": PowerTransformer,
         "quantile": QuantileTransformer,
-        "pca": PCA,
-        "kpca": KernelPCA,
-        "ipca": IncrementalPCA,
-        "fastica": FastICA,
-        "sparsepca": SparsePCA,
+        # decomposition classes are imported only when they are used
+        "pca": "sklearn.decomposition:PCA",
+        "kpca": "sklearn.decomposition:KernelPCA",
+        "ipca": "sklearn.decomposition:IncrementalPCA",
+        "fastica": "sklearn.decomposition:FastICA",
+        "sparsepca": "sklearn.decomposition:SparsePCA",
         "emd": EmdTransformer,
         "eemd": EmdTransformer,
     }
 
+    # methods which are applied with sklearn's FunctionTransformer. The functions are vectorized
+    # numpy functions and the data given to them is already a numeric array so sklearn does not
+    # need to validate it again.
+    _function_transformers = {
+        "log": dict(func=np.log, inverse_func=np.exp),
+        "log2": dict(func=np.log2, inverse_func=np.exp2),
+        "log10": dict(func=np.log10, inverse_func=functools.partial(np.power, 10)),
+        "tan": dict(func=np.tan, inverse_func=np.arctan),
+        "cumsum": dict(func=np.cumsum, inverse_func=np.diff, kw_args={"axis": 0},
+                       inv_kw_args={"axis": 0, "prepend": 0}),
+    }
+
     dim_expand_methods = ['emd', 'eemd']
     dim_red_methods = ["pca", "kpca", "ipca", "fastica", "sparsepca"]  # dimensionality reduction methods
     mod_dim_methods = dim_red_methods + dim_expand_methods
 
+    # methods which can be called as transform_with_<method> and inverse_transform_with_<method>
+    _transform_methods = frozenset(list(available_transformers.keys()) + list(_function_transformers.keys()))
+
     def __init__(self,
                  data: pd.DataFrame,
                  method: str = 'minmax',
@@ -160,6 +221,8 @@ class Transformations(scaler_container):
                  replace_with: Union[str, int, float] = 'mean',
                  replace_zeros: bool = False,
                  replace_zeros_with: Union[str, int, float] = 'mean',
+                 dtype: str = None,
+                 max_scalers: int = None,
                  **kwargs
                  ):
         """
@@ -187,6 +250,16 @@ class Transformations(scaler_container):
                 'mean', 'max', 'man'.
             replace_zeros : same as replace_nans but for zeros in the data.
             replace_zeros_with : same as `replace_with` for for zeros in the data.
+            dtype : if given e.g. "float32", the features are converted to this type
+                before being transformed. Using float32 halves the memory which the
+                scalers have to go through but the transformed values are less precise.
+                It is not applied for `power` and `quantile` methods which compute
+                in float64 anyway.
+            max_scalers : if given, only this many most recently fitted scalers are
+                kept in `scalers` and the older ones are dropped. By default all the
+                scalers are kept because they are fetched by their key for inverse
+                transformation. Set it when the same instance transforms data many
+                times and the keys of older scalers are not needed any more.
             kwargs : any arguments which are to be provided to transformer on
                 INTIALIZATION and not during transform or inverse transform e.g.
                 `n_components` for pca.
@@ -198,6 +271,11 @@ class Transformations(scaler_container):
         self.replace_with=replace_with
         self.replace_zeros=replace_zeros
         self.replace_zeros_with=replace_zeros_with
+        self.dtype = dtype
+        self.max_scalers = max_scalers
+        # where nans/zeros were in the data, these are set in pre_process_data
+        self._nan_mask = None
+        self._zero_mask = None
         data = self.pre_process_data(data.copy())
         self.data = data
 
@@ -227,17 +305,28 @@ class Transformations(scaler_container):
         """
         if item.startswith('_'):
             return self.__getattribute__(item)
-        elif item.startswith("transform_with"):
-            transformer = item.split('_')[2]
-            if transformer.lower() in list(self.available_transformers.keys()) + ["log", "tan", "cumsum", "log10", "log2"]:
+        elif item.startswith("transform_with_"):
+            transformer = item[len("transform_with_"):]
+            if transformer.lower() in self._transform_methods:
                 self.method = transformer
                 return self.transform_with_sklearn
-        elif item.startswith("inverse_transform_with"):
-            transformer = item.split('_')[3]
-            if transformer.lower() in list(self.available_transformers.keys()) + ["log", "tan", "cumsum", "log10", "log2"]:
+        elif item.startswith("inverse_transform_with_"):
+            transformer = item[len("inverse_transform_with_"):]
+            if transformer.lower() in self._transform_methods:
                 self.method = transformer
                 return self.inverse_transform_with_sklearn
 
+    @property
+    def method(self):
+        return self._method
+
+    @method.setter
+    def method(self, x):
+        # the lower case name and scaler class of method are found only when method is set
+        self._method = x
+        self._method_lc = x.lower()
+        self._scaler_cls = self.available_transformers.get(self._method_lc)
+
     @property
     def data(self):
         return self._data
@@ -248,7 +337,7 @@ class Transformations(scaler_container):
             self._data = x
         else:
             assert isinstance(x, np.ndarray)
-            xdf = pd.DataFrame(x, columns=['data'+str(i) for i in range(x.shape[1])])
+            xdf = pd.DataFrame(x, columns=dummy_columns(x.shape[1]), copy=False)
             self._data = xdf
 
     @property
@@ -276,14 +365,14 @@ class Transformations(scaler_container):
 
     @property
     def change_dim(self):
-        if self.method.lower() in self.mod_dim_methods:
-            return True
-        else:
-            return False
+        return self._method_lc in self.mod_dim_methods
 
     def get_scaler(self):
-
-        return self.available_transformers[self.method.lower()]
+        if self._scaler_cls is None:
+            raise KeyError(self._method_lc)
+        if isinstance(self._scaler_cls, str):
+            self._scaler_cls = import_scaler(self._scaler_cls)
+        return self._scaler_cls
 
     def pre_process_data(self, data):
         """Makes sure that data is dataframe and optionally replaces nans"""
@@ -291,50 +380,36 @@ class Transformations(scaler_container):
             data = data
         else:
             assert isinstance(data, np.ndarray)
-            data = pd.DataFrame(data, columns=['data'+str(i) for i in range(data.shape[1])])
+            data = pd.DataFrame(data, columns=dummy_columns(data.shape[1]), copy=False)
 
         # save the index if not already saved so that can be used later
         if self.index is None:
             self.index = data.index
 
         if self.replace_nans:
-            indices = {}
-
-            for col in data.columns:
-
-                # find index of nan values in current column of data
-                # https://stackoverflow.com/questions/14016247/find-integer-index-of-rows-with-nan-in-pandas-dataframe
-                i = data[col].index[data[col].apply(np.isnan)]
-                if len(i) > 0:
-                    indices[col] = i.values
-                    # replace nans with values
-                    if self.replace_with in ['mean', 'max', 'min']:
-                        replace_with = float(getattr(np, 'nan'+self.replace_with)(data[col]))
-                    else:
-                        replace_with = self.replace_with
-                    data[col][indices[col]] = get_val(data[col], replace_with)
-
-            # because pre_processing is implemented 2 times, we don't want to overwrite nan_indices
-            if self.nan_indices is None: self.nan_indices = indices
-
-            if len(indices) > 0:
-                if self.method.lower() == "cumsum":
+            # nans in all columns are found at once
+            mask = data.isna()
+            nan_cols = data.columns[mask.any().to_numpy()]
+
+            if len(nan_cols) > 0:
+                # replace nans with values, mean/max/min of a column are calculated ignoring nans
+                data = data.fillna(fill_values_for(data[nan_cols], self.replace_with))
+
+            # because pre_processing is implemented 2 times, we don't want to overwrite nan_mask
+            if self._nan_mask is None: self._nan_mask = mask[nan_cols]
+
+            if len(nan_cols) > 0:
+                if self._method_lc == "cumsum":
                     warnings.warn("Warning: nan values found and they may cause problem")
 
         if self.replace_zeros:
-            indices = {}
-            for col in data.columns:
-                # find index containing 0s in corrent column of dataframe
-                i = data.index[data[col] == 0.0]
-                if len(i) > 0:
-                    indices[col] = i.values
-                    if self.replace_zeros_with in ['mean', 'max', 'min']:
-                        replace_with = float(getattr(np, 'nan' + self.replace_zeros_with)(data[col]))
-                    else:
-                        replace_with = self.replace_zeros_with
-                    data[col][indices[col]] = get_val(data[col], replace_with)
-
-            if self.zero_indices is None: self.zero_indices = indices
+            mask = data == 0.0
+            zero_cols = data.columns[mask.any().to_numpy()]
+
+            if len(zero_cols) > 0:
+                data = data.mask(mask, fill_values_for(data[zero_cols], self.replace_zeros_with), axis=1)
+
+            if self._zero_mask is None: self._zero_mask = mask[zero_cols]
 
         # if self.replace_negatives:
         #     indices = {}
@@ -356,16 +431,13 @@ class Transformations(scaler_container):
     def post_process_data(self, data):
         """If nans/zeros were replaced with some value, put nans/zeros back."""
         if self.method not in self.dim_red_methods:
-            if self.replace_nans:
-                if hasattr(self, 'nan_indices'):
-
-                    for col, idx in self.nan_indices.items():
-                        data[col][idx] = np.nan
+            # the masks are aligned with data because data may not have all the rows/columns
+            if self.replace_nans and self._nan_mask is not None:
+                data = data.mask(self._nan_mask.reindex(index=data.index, columns=data.columns, fill_value=False))
 
-            if self.replace_zeros:
-                if hasattr(self, 'zero_indices'):
-                    for col, idx in self.zero_indices.items():
-                        data[col][idx] = 0.0
+            if self.replace_zeros and self._zero_mask is not None:
+                data = data.mask(self._zero_mask.reindex(index=data.index, columns=data.columns, fill_value=False),
+                                 0.0)
 
             # if self.replace_negatives:
             #     if hasattr(self, 'negative_indices'):
@@ -377,7 +449,7 @@ class Transformations(scaler_container):
 
         to_transform = self.get_features()  #TODO, shouldn't kwargs go here as input?
 
-        if self.method.lower() in ["log", "log10", "log2"]:
+        if self._method_lc in ["log", "log10", "log2"]:
 
             if (to_transform.values < 0).any():
                 raise InvalidValueError(self.method, "negative")
@@ -388,31 +460,23 @@ class Transformations(scaler_container):
             if 0 in to_transform.values:
                 raise InvalidValueError(self.method, "zero")
 
-            if self.method == "log":
-                scaler = FunctionTransformer(func=np.log, inverse_func=np.exp, validate=True, check_inverse=True)
-            elif self.method == "log2":
-                scaler = FunctionTransformer(func=np.log2, inverse_func=lambda x:2**x, validate=True,
-                                             check_inverse=True)
-            else:   # "log10":
-                scaler = FunctionTransformer(func=np.log10, inverse_func=lambda x:10**x, validate=True,
-                                             check_inverse=True)
-        elif self.method.lower() == "tan":
-            scaler = FunctionTransformer(func=np.tan, inverse_func=np.tanh, validate=True, check_inverse=False)
-        elif self.method.lower() == "cumsum":
-            scaler = FunctionTransformer(func=np.cumsum, inverse_func=np.diff, validate=True, check_inverse=False,
-                                         kw_args={"axis": 0}, inv_kw_args={"axis": 0, "append": 0})
+        if self._method_lc in self._function_transformers:
+            # checking the inverse costs an extra round trip at fit time, so it is only done on request
+            scaler = FunctionTransformer(validate=False, check_inverse=self.kwargs.get("check_inverse", False),
+                                         **self._function_transformers[self._method_lc])
         else:
             scaler = self.get_scaler()(**self.kwargs)
 
-        data = scaler.fit_transform(to_transform, **kwargs)
+        # scalers are given the underlying array so that sklearn does not have to convert the DataFrame
+        data = scaler.fit_transform(to_transform.to_numpy(), **kwargs)
 
-        if self.method.lower() in self.mod_dim_methods:
-            features = [self.method.lower() + str(i+1) for i in range(data.shape[1])]
-            data = pd.DataFrame(data, columns=features)
+        if self._method_lc in self.mod_dim_methods:
+            features = [self._method_lc + str(i+1) for i in range(data.shape[1])]
+            data = pd.DataFrame(data, columns=features, copy=False)
             self.transformed_features = features
             self.features = features
         else:
-            data = pd.DataFrame(data, columns=to_transform.columns)
+            data = pd.DataFrame(data, columns=to_transform.columns, copy=False)
 
         scaler = self.serialize_scaler(scaler, to_transform)
 
@@ -431,15 +495,15 @@ class Transformations(scaler_container):
 
         to_transform = self.get_features(**kwargs)
 
-        data = scaler.inverse_transform(to_transform)
+        data = scaler.inverse_transform(to_transform.to_numpy())
 
-        if self.method.lower() in self.mod_dim_methods:
+        if self._method_lc in self.mod_dim_methods:
             # now use orignal data columns names, but if the class is being directly called for inverse transform
             # then we don't know what cols were transformed, in that scenariio use dummy col name.
-            cols = ['data'+str(i) for i in range(data.shape[1])] if self.transformed_features is None else self.data.columns
-            data = pd.DataFrame(data, columns=cols)
+            cols = dummy_columns(data.shape[1]) if self.transformed_features is None else self.data.columns
+            data = pd.DataFrame(data, columns=cols, copy=False)
         else:
-            data = pd.DataFrame(data, columns=to_transform.columns)
+            data = pd.DataFrame(data, columns=to_transform.columns, copy=False)
 
         data = self.maybe_insert_features(data)
 
@@ -451,7 +515,7 @@ class Transformations(scaler_container):
         """
         Transforms the data
         """
-        return getattr(self, "transform_with_" + self.method.lower())(return_key=return_key, **kwargs)
+        return getattr(self, "transform_with_" + self._method_lc)(return_key=return_key, **kwargs)
 
     def inverse_transform(self, **kwargs):
         """
@@ -460,22 +524,27 @@ class Transformations(scaler_container):
         if 'key' in kwargs or 'scaler' in kwargs:
             pass
         elif len(self.scalers) ==1:
-            kwargs['scaler'] = self.scalers[list(self.scalers.keys())[0]]['scaler']
+            kwargs['scaler'] = self.scalers[next(iter(self.scalers))]['scaler']
 
-        return getattr(self, "inverse_transform_with_" + self.method.lower())(**kwargs)
+        return getattr(self, "inverse_transform_with_" + self._method_lc)(**kwargs)
 
     def get_features(self, **kwargs) -> pd.DataFrame:
-        # use the provided data if given otherwise use self.data
-        data = kwargs['data'] if 'data' in kwargs else self.data
-
-        if self.replace_nans:
-            data = self.pre_process_data(data)
-
-        if self.features is None:
-            return data
+        # use the provided data if given otherwise use self.data which has already
+        # been pre-processed in __init__
+        if 'data' in kwargs:
+            data = kwargs['data']
+            if self.replace_nans:
+                data = self.pre_process_data(data)
         else:
+            data = self.data
+
+        if self.features is not None:
             assert isinstance(self.features, list)
-            return data[self.features]
+            data = data[self.features]
+
+        if self.dtype is not None and self._method_lc not in ["power", "quantile"]:
+            data = data.astype(self.dtype)
+        return data
 
     def serialize_scaler(self, scaler, to_transform):
         key = self.method + str(dateandtime_now())
@@ -486,6 +555,10 @@ class Transformations(scaler_container):
         }
         self.scalers[key] = serialized_scaler
 
+        # dicts keep the insertion order so the first key is of the oldest scaler
+        if self.max_scalers is not None and len(self.scalers) > self.max_scalers:
+            self.scalers.pop(next(iter(self.scalers)))
+
         return serialized_scaler
 
     def get_scaler_from_dict(self, **kwargs):
@@ -503,16 +576,11 @@ class Transformations(scaler_container):
             trans_df.index = self.index
 
         transformed_features = len(self.transformed_features) if self.transformed_features is not None else len(trans_df.columns)
-        num_features = len(self.data.columns) if self.method.lower() not in self.mod_dim_methods else transformed_features
+        num_features = len(self.data.columns) if self._method_lc not in self.mod_dim_methods else transformed_features
         if len(trans_df.columns) != num_features:
-            df = pd.DataFrame(index=self.index)
-            for col in self.data.columns: #features:
-                if col in trans_df.columns:
-                    _df = trans_df[col]
-                else:
-                    _df = self.data[col]
-
-                df = pd.concat([df, _df], axis=1, sort=True)
+            # the untransformed columns are taken from data and the frame is made once
+            cols = {col: trans_df[col] if col in trans_df.columns else self.data[col] for col in self.data.columns}
+            df = pd.DataFrame(cols, index=self.index)
         else:
             df = trans_df
 
@@ -539,6 +607,8 @@ class Transformations(scaler_container):
             raise ValueError
 
     def plot_pca3d(self, target, pcs, labels, save):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
 
         fig = plt.figure(1, figsize=(4, 3))
         plt.clf()
@@ -546,13 +616,13 @@ class Transformations(scaler_container):
 
         plt.cla()
         for label, name in enumerate(labels):
-            ax.text3D(pcs[target == label, 0].mean(),
-                      pcs[target == label, 1].mean() + 1.5,
-                      pcs[target == label, 2].mean(), name,
+            # points of a label are selected once and the mean of all three axes is taken together
+            x, y, z = pcs[target == label, :3].mean(axis=0)
+            ax.text3D(x, y + 1.5, z, name,
                       horizontalalignment='center',
                       bbox=dict(alpha=.5, edgecolor='w', facecolor='w'))
         # Reorder the labels to have colors matching the cluster results
-        target = np.choose(target, [1, 2, 0]).astype(np.float)
+        target = np.choose(target, [1, 2, 0]).astype(float)
 
         ax.scatter(pcs[:, 0], pcs[:, 1], pcs[:, 2], c=target, cmap=plt.cm.nipy_spectral,
                edgecolor='k')
@@ -565,9 +635,11 @@ class Transformations(scaler_container):
         return
 
     def plot_pca2d(self, target, pcs, labels, save):
+        import matplotlib.pyplot as plt
 
         for i, target_name in zip([0, 1, 2], labels):
-            plt.scatter(pcs[target == i, 0], pcs[target == i, 1], alpha=.8, lw=2,
+            selected = pcs[target == i]
+            plt.scatter(selected[:, 0], selected[:, 1], alpha=.8, lw=2,
                         label=target_name)
         plt.legend(loc='best', shadow=False, scatterpoints=1)
         plt.title('PCA of IRIS dataset')
@@ -575,6 +647,33 @@ class Transformations(scaler_container):
         return
 
 
+@functools.lru_cache(maxsize=None)
+def dummy_columns(n: int) -> pd.Index:
+    """column names for an array with `n` columns, made once for each `n`. pd.Index is
+    immutable so the same object can be shared by all the DataFrames."""
+    return pd.Index(['data'+str(i) for i in range(n)])
+
+
+_imported_scalers = {}
+
+
+def import_scaler(path: str):
+    """imports the class given as "module:class" and keeps it so that it is imported only once."""
+    if path not in _imported_scalers:
+        module, name = path.split(':')
+        _imported_scalers[path] = getattr(importlib.import_module(module), name)
+    return _imported_scalers[path]
+
+
+def fill_values_for(df: pd.DataFrame, method):
+    """Returns the values with which the columns of `df` are to be filled. A string
+    method is calculated for all the columns with a single reduction, otherwise
+    the scalar is repeated for each column."""
+    if isinstance(method, str):
+        return df.agg(method.lower()).astype(float)
+    return pd.Series(get_val(df, method), index=df.columns)
+
+
 def get_val(df:pd.DataFrame, method):
 
     if isinstance(method, str):
@@ -591,6 +690,7 @@ def get_val(df:pd.DataFrame, method):
 
 
 def end_fig(save):
+    import matplotlib.pyplot as plt
     if save is None:
         pass
     elif save:
@@ -1,9 +1,12 @@
 import unittest
 import os
+import shutil
+import tempfile
 import site   # so that AI4Water directory is in path
 site.addsitedir(os.path.dirname(os.path.dirname(__file__)) )
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
 from AI4Water.utils.datasets import CAMELS_GB, CAMELS_BR, CAMELS_AUS, CAMELS_CL, CAMELS_US, LamaH, HYSETS, HYPE
@@ -452,6 +455,33 @@ class TestPangaea(unittest.TestCase):
         dataset = GeoChemMatane()
         check_data(dataset, 1, 166)
 
+    def test_as_numpy(self):
+        # a data file with pangaea style column names is written in the directory of dataset
+        text = ("Date/Time,Depth water [m],Temp [°C],Flag\n"
+                "2011-01-01T00:00,1.5,3.25,1\n"
+                "2011-01-01T01:00,,3.5,2\n"
+                "2011-01-01T02:00,2.0,,3\n")
+        base_dir = tempfile.mkdtemp()
+
+        class _Weisssee(Weisssee):
+            base_ds_dir = base_dir
+
+        fpath = os.path.join(base_dir, _Weisssee.__name__, 'data.txt')
+        os.makedirs(os.path.dirname(fpath))
+        with open(fpath, 'w', encoding='utf-8') as fp:
+            fp.write(text)
+        try:
+            data = _Weisssee().fetch(as_numpy=True)['data']
+            # same column names and values as with the default parser of pandas, time stamps are not parsed
+            df = pd.read_csv(fpath, engine='c')
+        finally:
+            shutil.rmtree(base_dir)
+
+        assert list(data.keys()) == list(df.columns)
+        assert data['Date/Time'].tolist() == ['2011-01-01T00:00', '2011-01-01T01:00', '2011-01-01T02:00']
+        for col in ['Depth water [m]', 'Temp [°C]', 'Flag']:
+            np.testing.assert_array_equal(data[col], df[col].to_numpy())
+
 
 
 if __name__=="__main__":
@@ -1,11 +1,16 @@
 import unittest
 import os
+import shutil
+import tempfile
+import warnings
 import site   # so that AI4Water directory is in path
 site.addsitedir(os.path.dirname(os.path.dirname(__file__)) )
 
+import numpy as np
 import pandas as pd
 
-from AI4Water.utils.datasets import WeatherJena, SWECanada, MtropicsLaos
+from AI4Water.utils.datasets import WeatherJena, SWECanada, MtropicsLaos, get_dataset
+from AI4Water.utils.datasets.datasets import DATASETS, Datasets
 
 # wj = WeatherJena()
 # df = wj.fetch()
@@ -67,5 +72,157 @@ class TestMtropicsLaos(unittest.TestCase):
         assert rg.shape == (6939, 7)
         assert int(rg.isna().sum().sum()) == 34510
 
+
+def synthetic_laos():
+    """MtropicsLaos whose fetch_* methods return small synthetic frames instead of downloaded data"""
+    laos_ = MtropicsLaos.__new__(MtropicsLaos)
+
+    def _slice(df, st, en):
+        return df.loc[st:en].copy()
+
+    ecoli = pd.DataFrame({'Ecoli_mpn100': [10.0, 20.0, 30.0]},
+                         index=pd.to_datetime(['20110101 00:00', '20110101 00:00', '20110101 00:30']))
+    pcp = pd.DataFrame({'pcp': [0.0, 0.5, 1.0, 1.5]},
+                       index=pd.date_range('20110101 00:06', periods=4, freq='6min'))
+    wl = pd.DataFrame({'water_level': [1.0, 2.0]}, index=pd.to_datetime(['20110101 00:00', '20110101 00:12']))
+    spm = pd.DataFrame({'susp_pm': [5.0]}, index=pd.to_datetime(['20110101 00:30']))
+
+    laos_.fetch_ecoli = lambda st=None, en=None, features=None: _slice(ecoli, st, en)
+    laos_.fetch_pcp = lambda st=None, en=None: _slice(pcp, st, en)
+    laos_.fetch_hydro = lambda st=None, en=None: (_slice(wl, st, en), _slice(spm, st, en))
+    return laos_
+
+
+class TestMtropicsLaosFetch(unittest.TestCase):
+
+    def test_outer_join(self):
+        df = synthetic_laos().fetch(['pcp', 'water_level'], 'Ecoli_mpn100')
+        assert list(df.columns) == ['pcp', 'water_level', 'Ecoli_mpn100']
+        # all time stamps at which any of the features is observed
+        assert len(df) == 6
+        assert df.index.is_monotonic_increasing
+        assert int(df['pcp'].notna().sum()) == 4
+        assert int(df['water_level'].notna().sum()) == 2
+        assert df.loc['20110101 00:12', 'pcp'] == 0.5
+        assert df.loc['20110101 00:12', 'water_level'] == 2.0
+
+    def test_duplicated_time_stamps(self):
+        df = synthetic_laos().fetch(['pcp'], 'Ecoli_mpn100')
+        assert df.index.is_unique
+        # the first observation at a duplicated time stamp is kept
+        assert df.loc['20110101 00:00', 'Ecoli_mpn100'] == 10.0
+        assert int(df['Ecoli_mpn100'].notna().sum()) == 2
+
+    def test_st_en(self):
+        df = synthetic_laos().fetch(['pcp', 'susp_pm'], 'Ecoli_mpn100', st='20110101 00:10', en='20110101 00:20')
+        assert len(df) == 2
+        assert df['susp_pm'].isna().all()
+
+    def test_hru_definition(self):
+        self.assertRaises(NotImplementedError, synthetic_laos().fetch, ['pcp'], 'Ecoli_mpn100', 'unique_lu')
+
+
+
+class TestGetDataset(unittest.TestCase):
+
+    def test_datasets(self):
+        for name, cls in DATASETS.items():
+            assert issubclass(cls, Datasets)
+            assert cls.__name__ == name
+
+    def test_unknown_dataset(self):
+        self.assertRaises(ValueError, get_dataset, 'NoSuchDataset')
+
+    def test_get_dataset(self):
+        class Dummy(Datasets):
+            pass
+
+        DATASETS['Dummy'] = Dummy
+        try:
+            ds = get_dataset('Dummy', units='si')
+        finally:
+            DATASETS.pop('Dummy')
+        assert isinstance(ds, Dummy)
+        assert ds.units == 'si'
+
+
+def write_swe_nc(path, stations):
+    """writes a small netCDF file with the layout of CanSWE data"""
+    import netCDF4
+    num_steps = len(pd.date_range('19280101', '20200731', freq='D'))
+    with netCDF4.Dataset(path, 'w') as nc:
+        nc.createDimension('station_id', len(stations))
+        nc.createDimension('time', num_steps)
+        stn = nc.createVariable('station_id', str, ('station_id',))
+        for i, name in enumerate(stations):
+            stn[i] = name
+        for i, var in enumerate(SWECanada.feaures):
+            v = nc.createVariable(var, 'f4', ('station_id', 'time'), fill_value=-999.0)
+            data = np.arange(len(stations) * num_steps, dtype=np.float32).reshape(len(stations), num_steps) + i
+            data[:, :10] = -999.0
+            v[:] = data
+        for var in SWECanada.q_flags:
+            v = nc.createVariable(var, 'i1', ('station_id', 'time'))
+            v[:] = np.zeros((len(stations), num_steps), dtype=np.int8)
+    return
+
+
+class TestSWECanada(unittest.TestCase):
+    """SWECanada with a small synthetic netCDF file instead of the downloaded one"""
+
+    stations = ['ALE-05AE810', 'BC-1A01P', 'QC-7060400']
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+
+        class _SWECanada(SWECanada):
+            base_ds_dir = self.base_dir
+
+        self.cls = _SWECanada
+        ds_dir = os.path.join(self.base_dir, _SWECanada.__name__)
+        os.makedirs(ds_dir)
+        write_swe_nc(os.path.join(ds_dir, SWECanada.fname), self.stations)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def test_fetch(self):
+        with self.cls() as swe:
+            assert swe.stations() == self.stations
+            data = swe.fetch(['QC-7060400', 'ALE-05AE810'], q_flags='all', st='19280105', en='19280131')
+        assert list(data.keys()) == ['QC-7060400', 'ALE-05AE810']
+        df = data['QC-7060400']
+        assert df.shape == (27, 7)
+        # values equal to _FillValue are nan
+        assert int(df['snw'].isna().sum()) == 6
+        assert df['qc_flag_snw'].dtype == np.float32
+
+    def test_rechunk(self):
+        with self.cls() as swe:
+            chunked = os.path.join(swe.ds_dir, SWECanada.chunked_fname)
+            # the file is rechunked only if nccopy is available
+            if shutil.which('nccopy') is None:
+                assert not os.path.exists(chunked)
+                assert swe.nc_path == os.path.join(swe.ds_dir, SWECanada.fname)
+            else:
+                assert os.path.exists(chunked)
+                assert swe.nc_path == chunked
+            df = swe.fetch('BC-1A01P')['BC-1A01P']
+        num_steps = len(df)
+        np.testing.assert_array_equal(df['snd'].values[10:], np.arange(num_steps, 2 * num_steps)[10:] + 1)
+
+    def test_backend(self):
+        self.assertRaises(AssertionError, self.cls, backend='h5py')
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            swe_xr = self.cls(backend='xarray')
+        with swe_xr, self.cls() as swe_nc:
+            xr_data = swe_xr.fetch(self.stations, q_flags='all')
+            nc_data = swe_nc.fetch(self.stations, q_flags='all')
+        for stn in self.stations:
+            pd.testing.assert_frame_equal(xr_data[stn], nc_data[stn], check_dtype=False)
+
+
 if __name__=="__main__":
     unittest.main()
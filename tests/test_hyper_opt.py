@@ -1,4 +1,5 @@
 import os
+import json
 import time
 import pickle
 import unittest
@@ -242,6 +243,48 @@ class TestHyperOpt(unittest.TestCase):
             # np.testing.assert_almost_equal(-0.909471164417979, sr.fun, 7)  # when called from same file where hyper_opt is saved
         return
 
+    def test_bayes_rf_surrogate(self):
+        # bayesian optimization with random forest as surrogate model instead of gaussian process
+        def f(x):
+            return (x[0] - 0.3) ** 2
+
+        opt = HyperOpt("bayes", objective_fn=f, param_space=[Real(low=-2.0, high=2.0, name='x')],
+                       n_calls=12,
+                       n_random_starts=5,
+                       random_state=2,
+                       surrogate='RF'
+                       )
+        sr = opt.fit()
+        assert len(sr.x_iters) == 12
+        assert len(opt.results) == 12
+        assert os.path.exists(os.path.join(opt.opt_path, 'gp_parameters.json'))
+        return
+
+    def test_bayes_parallel(self):
+        # points are evaluated in 2 processes and the best point must be found as in sequential evaluation
+        def f(x):
+            return (x[0] - 0.3) ** 2
+
+        best = {}
+        for n_jobs in [1, 2]:
+            opt = HyperOpt("bayes", objective_fn=f, param_space=[Real(low=-2.0, high=2.0, name='x')],
+                           n_calls=14,
+                           n_random_starts=5,
+                           random_state=2,
+                           n_jobs=n_jobs
+                           )
+            sr = opt.fit()
+            assert len(opt.results) == len(sr.x_iters) == 14
+            best[n_jobs] = opt.best_paras()['x']
+
+        np.testing.assert_allclose(best[2], best[1], atol=0.05)
+        np.testing.assert_allclose(best[2], 0.3, atol=0.05)
+
+        with self.assertWarnsRegex(UserWarning, 'not supported'):
+            HyperOpt("bayes", objective_fn=f, param_space=[Real(low=-2.0, high=2.0, name='x')],
+                     n_calls=6, n_random_starts=4, n_jobs=2, verbose=True).fit()
+        return
+
     def test_grid_custom_model(self):
         # testing grid search algorithm for custom model
         def f(x, noise_level=0.1):
@@ -259,6 +302,29 @@ class TestHyperOpt(unittest.TestCase):
         assert len(sr) == 20
         return
 
+    def test_grid_same_losses(self):
+        # evaluations with same loss must all be kept
+        def f(x):
+            return float(int(abs(x) * 3))
+
+        opt = HyperOpt("grid",
+                       objective_fn=f,
+                       param_space=[Real(low=-2.0, high=2.0, num_samples=35, name='x')],
+                       )
+        sr = opt.fit()
+        assert len(sr) == 35
+        assert len(opt.func_vals()) == 35
+        losses = [ev['loss'] for ev in opt.evaluations.values()]
+        assert losses == list(opt.func_vals())
+        # losses are the keys and are in order of evaluation
+        np.testing.assert_allclose(list(sr.keys()), losses, atol=1e-12)
+        with open(os.path.join(opt.opt_path, "iterations.json"), "r") as fp:
+            iterations = json.load(fp)
+        assert len(iterations) == 35
+        np.testing.assert_allclose([float(k) for k in iterations], losses, atol=1e-12)
+        assert abs(opt.best_paras()['x']) < 1/3
+        return
+
     def test_named_custom_bayes(self):
         dims = [Integer(low=1000, high=2000, name='n_estimators'),
                 Integer(low=3, high=6, name='max_depth'),
@@ -308,6 +374,25 @@ class TestHyperOpt(unittest.TestCase):
         check_attrs(opt, 4)
         return
 
+    def test_warm_start_named_args(self):
+        # the points evaluated by first optimization are used by the second one
+        def f(**kwargs):
+            return (kwargs['x'] - 0.3) ** 2 + (kwargs['y'] + 0.2) ** 2
+
+        dims = [Real(low=-2.0, high=2.0, name='x'), Real(low=-1.0, high=1.0, name='y')]
+        opt_path = os.path.join(os.getcwd(), 'results', 'test_warm_start_named_args')
+
+        opt = HyperOpt("bayes", objective_fn=f, param_space=dims, n_calls=12, n_random_starts=5,
+                       random_state=2, opt_path=opt_path)
+        opt.fit()
+
+        opt2 = HyperOpt("bayes", objective_fn=f, param_space=dims, n_calls=12, n_random_starts=5,
+                        random_state=3, warm_start_from=opt_path)
+        sr = opt2.fit()
+        assert len(sr.x_iters) == 24
+        assert sr.fun <= opt.gpmin_results.fun
+        return
+
     def test_ai4water_bayes(self):
         dims = [Integer(low=1000, high=2000, name='n_estimators'),
                 Integer(low=3, high=6, name='max_depth'),
@@ -375,6 +460,26 @@ class TestHyperOpt(unittest.TestCase):
         self.assertGreater(len(best), 0)
         return
 
+    def test_hyperopt_trials_jsonl(self):
+        # only loss and status of the dictionary returned by objective are logged
+        def objective(x):
+            return {'loss': x ** 2, 'status': STATUS_OK, 'attachments': {'time_module': pickle.dumps(time.time)}}
+
+        optimizer = HyperOpt('tpe',
+                             objective_fn=objective,
+                             param_space=hp.uniform('x', -10, 10),
+                             backend='hyperopt',
+                             max_evals=10)
+        optimizer.fit()
+
+        with open(os.path.join(optimizer.opt_path, 'trials.jsonl'), 'r') as fp:
+            trials = [json.loads(line) for line in fp]
+        self.assertEqual(len(trials), 10)
+        for trial in trials:
+            self.assertEqual(trial['status'], STATUS_OK)
+            self.assertAlmostEqual(trial['loss'], trial['params'] ** 2)
+        return
+
     def test_hyperopt_multipara(self):
         # https://github.com/hyperopt/hyperopt/blob/master/tutorial/02.MultipleParameterTutorial.ipynb
         def objective(**params):
@@ -1,6 +1,7 @@
 import os
 import site   # so that AI4Water directory is in path
 import unittest
+from unittest import mock
 site.addsitedir(os.path.dirname(os.path.dirname(__file__)) )
 
 import numpy as np
@@ -288,6 +289,21 @@ class test_Scalers(unittest.TestCase):
 
         return normalized_df, denormalized_df
 
+    def test_emd_n_jobs_max_imf(self):
+        # columns decomposed in parallel must give same IMFs as decomposing them one by one with PyEMD
+        from PyEMD import EMD
+        from AI4Water.utils.transformations import EmdTransformer
+
+        t = np.linspace(0, 1, 200)
+        a = np.stack([np.sin(20 * t) + np.cos(3 * t), np.sin(7 * t) + t], axis=1)
+
+        sequential = np.concatenate([EMD().emd(a[:, col], max_imf=2).T for col in range(a.shape[1])], axis=1)
+        for n_jobs in [1, 2]:
+            imfs = EmdTransformer(n_jobs=n_jobs, max_imf=2).fit_transform(a)
+            self.assertEqual(imfs.dtype, np.float64)
+            np.testing.assert_allclose(imfs, sequential)
+        return
+
     def test_plot_pca3d(self):
         from sklearn import datasets
 
@@ -341,6 +357,50 @@ class test_Scalers(unittest.TestCase):
         run_log_methods("cumsum", True, insert_nans=True, assert_equality=False)
         return
 
+    def test_tan_inverse(self):
+        a = pd.DataFrame(np.random.random((10, 2)), columns=['data1', 'data2'])
+        for run_method in [run_method1, run_method2, run_method3]:
+            normalized, denormalized = run_method("tan", data=a)
+            np.testing.assert_allclose(normalized.values, np.tan(a.values))
+            np.testing.assert_allclose(denormalized.values, a.values)
+        return
+
+    def test_cumsum_inverse(self):
+        a = pd.DataFrame(np.random.random((10, 2)), columns=['data1', 'data2'])
+        for run_method in [run_method1, run_method2, run_method3]:
+            normalized, denormalized = run_method("cumsum", data=a)
+            np.testing.assert_allclose(normalized.values, np.cumsum(a.values, axis=0))
+            np.testing.assert_allclose(denormalized.values, a.values)
+        return
+
+    def test_check_inverse(self):
+        a = pd.DataFrame(np.random.random((10, 2)), columns=['data1', 'data2'])
+        _, denormalized = run_method2("log", data=a, check_inverse=True)
+        np.testing.assert_allclose(denormalized.values, a.values)
+        return
+
+    def test_max_scalers(self):
+        scaler = Transformations(data=df, method='minmax', max_scalers=2)
+        keys = []
+        # scalers fitted in the same second have same key so the time stamps are given one by one
+        with mock.patch('AI4Water.utils.transformations.dateandtime_now', side_effect=['1', '2', '3']):
+            for _ in range(3):
+                normalized, scaler_dict = scaler.transform(return_key=True)
+                keys.append(scaler_dict['key'])
+        # only the two most recent scalers are kept
+        self.assertEqual(list(scaler.scalers.keys()), keys[1:])
+        denormalized = scaler.inverse_transform(data=normalized, key=keys[-1])
+        np.testing.assert_allclose(denormalized.values, df.values)
+        self.assertRaises(KeyError, scaler.inverse_transform, data=normalized, key=keys[0])
+        return
+
+    def test_dtype(self):
+        for method in ["minmax", "log"]:
+            normalized, denormalized = run_method2(method, data=df, dtype="float32")
+            self.assertTrue(all(normalized.dtypes == np.float32))
+            np.testing.assert_allclose(denormalized.values, df.values, rtol=1e-5)
+        return
+
     def test_zero_log(self):
         run_log_methods("log", True, insert_nans=True, insert_zeros=True)
         return